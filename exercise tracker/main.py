@@ -1,21 +1,55 @@
+from utils import startup  # first, so the startup clock covers every import below
+import argparse
 import tkinter as tk
 import tkinter.messagebox as messagebox
-import sqlite3
+import queue
+from collections import OrderedDict
 from tkinter import ttk
-from PIL import Image, ImageTk
-import pygame.mixer
-
-from pages.home import HomePage
-from pages.simple import SimplePage
-from pages.medium import MediumPage
-from pages.complex import ComplexPage
-from pages.user import UserPage
-from pages.workout import WorkoutPage
-from pages.login_signup import LoginSignupPage
-from pages.create_account import CreateAccountPage
-from pages.progress import ProgressPage
-from pages.settings import SettingsPage
-from pages.recommendations import RecommendationsPage
+
+from utils.db import close_all
+from utils.migrations import migrate
+from utils.catalog import get_catalog
+from utils.write_queue import CompletionWriter
+from utils.loader import DataLoader
+
+# Page name -> (module, class). A page's module (and whatever it pulls in:
+# matplotlib, numpy, pygame) is only imported the first time it is shown.
+PAGES = {
+    "login_signup": ("pages.login_signup", "LoginSignupPage"),
+    "create_account": ("pages.create_account", "CreateAccountPage"),
+    "home": ("pages.home", "HomePage"),
+    "simple": ("pages.simple", "SimplePage"),
+    "medium": ("pages.medium", "MediumPage"),
+    "complex": ("pages.complex", "ComplexPage"),
+    "user": ("pages.user", "UserPage"),
+    "workout": ("pages.workout", "WorkoutPage"),
+    "progress": ("pages.progress", "ProgressPage"),
+    "recommendations": ("pages.recommendations", "RecommendationsPage"),
+    "settings": ("pages.settings", "SettingsPage"),
+}
+LOGIN_PAGES = ("login_signup", "create_account")
+MAX_CACHED_PAGES = 6  # live pages kept for instant revisits; the least recently shown is destroyed
+
+# Imported in the background: Home while the user is typing their login,
+# everything the sidebar leads to once they are in
+WARM_UP_BEFORE_LOGIN = ("pages.home", "utils.recommender")
+WARM_UP_AFTER_LOGIN = (
+    "pages.recommendations", "pages.progress", "pages.workout", "pages.user",
+    "pages.settings", "pages.simple", "pages.medium", "pages.complex",
+)
+
+startup.mark("main.py imports done")
+
+
+def _init_mixer():
+    import pygame.mixer
+    pygame.mixer.init()
+
+
+def _build_assets():
+    from utils.assets import asset_store
+    return asset_store.ensure()
+
 
 class App(tk.Tk):
     def __init__(self):
@@ -24,7 +58,28 @@ class App(tk.Tk):
         self.geometry("1000x600")
         self.configure(bg="white")
 
-        self.logged_in_user_id = None
+        self.session = None  # utils.session.Session once someone logs in
+        self._ui_calls = queue.Queue()
+        self.completion_writer = CompletionWriter(
+            on_retrying=lambda count: self.run_on_ui(self._show_pending_saves, count))
+        self.loader = DataLoader(self.run_on_ui)
+        # Owner for app-wide background jobs. Never packed; a <Destroy> binding
+        # on the root itself would fire for every widget destroyed in the app.
+        self._background = tk.Frame(self)
+
+        # Built pages stay alive (hidden) between visits, most recently shown last
+        self._pages = OrderedDict()
+        self._page_themes = {}
+        self._current_page = None
+        self._current_page_name = None
+        self._warmed_up = False
+
+        try:
+            migrate()
+            get_catalog()  # load the exercise catalog once up front
+            self.completion_writer.start()
+        except Exception as e:
+            messagebox.showerror("Database Error", f"Failed to open the database: {e}")
 
         self.sidebar = tk.Frame(self, width=200, bg="#f0f0f0")
         self.sidebar.pack(side="left", fill="y")
@@ -40,6 +95,9 @@ class App(tk.Tk):
             fg="black"
         ).pack(pady=10)
 
+        # Shown while saved workouts wait for the database to accept them
+        self.pending_saves_label = tk.Label(self.banner, text="", font=("Arial", 10), bg="#ffd700", fg="black")
+
         self.main_content_wrapper = tk.Frame(self, bg="white")
         self.main_content_wrapper.pack(side="right", expand=True, fill="both")
 
@@ -85,12 +143,65 @@ class App(tk.Tk):
             "frame_bg": "white"
         }
         
-        try:
-            pygame.mixer.init()
-        except Exception as e:
-            messagebox.showerror("Pygame Error", f"Failed to initialize Pygame mixer: {e}")
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.after(50, self._drain_ui_calls)
 
         self.show_page("login_signup")
+        self.after_idle(self._on_first_paint)  # idle callbacks run after the pending redraw
+
+    def _on_first_paint(self):
+        startup.mark("first paint (login window drawn)")
+        if startup.enabled:
+            startup.report()
+
+        # Nothing below is needed to log in, so it all happens off the Tk thread
+        self.loader.load(self._background, _init_mixer, lambda _: None,
+                         on_error=lambda e: messagebox.showerror("Pygame Error", f"Failed to initialize Pygame mixer: {e}"))
+        # First launch, or images changed: rebuild the thumbnail store while the login page is up
+        self.loader.load(self._background, _build_assets, lambda rebuilt: None,
+                         on_error=lambda e: print(f"Could not build the asset store: {e}"))
+        self.loader.load(self._background, lambda: startup.warm_up(WARM_UP_BEFORE_LOGIN), lambda _: None)
+
+    def _show_pending_saves(self, count):
+        if count:
+            noun = "workout" if count == 1 else "workouts"
+            self.pending_saves_label.config(text=f"⏳ {count} saved {noun} waiting for the database, retrying...")
+            self.pending_saves_label.pack(pady=(0, 5))
+        else:
+            self.pending_saves_label.pack_forget()
+
+    def _page_class(self, page_name):
+        spec = PAGES.get(page_name)
+        if spec is None:
+            return None
+        module_name, class_name = spec
+        return getattr(startup.import_module(module_name), class_name)
+
+    @property
+    def logged_in_user_id(self):
+        return self.session.user_id if self.session else None
+
+    def on_close(self):
+        self.loader.shutdown()
+        self.completion_writer.stop()  # flushes queued saves before the DB closes
+        close_all()
+        self.destroy()
+
+    def run_on_ui(self, func, *args):
+        """Schedule func(*args) on the Tk thread; safe to call from worker threads."""
+        self._ui_calls.put((func, args))
+
+    def _drain_ui_calls(self):
+        while True:
+            try:
+                func, args = self._ui_calls.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                func(*args)
+            except Exception as e:
+                print(f"Error in UI callback: {e}")
+        self.after(50, self._drain_ui_calls)
 
     def add_sidebar_button(self, text, command):
         button = tk.Button(self.sidebar, text=text, anchor="w", bg="#f0f0f0",
@@ -107,24 +218,9 @@ class App(tk.Tk):
             button.config(state=tk.DISABLED)
 
     def show_page(self, page_name):
-        for widget in self.scrollable_frame.winfo_children():
-            widget.destroy()
-
         user_age = None
-        if self.logged_in_user_id and page_name not in ["login_signup", "create_account"]:
-            conn = None
-            try:
-                conn = sqlite3.connect("fitness_app.db")
-                cursor = conn.cursor()
-                cursor.execute("SELECT age FROM user_profile WHERE id = ?", (self.logged_in_user_id,))
-                age_row = cursor.fetchone()
-                if age_row:
-                    user_age = age_row[0]
-            except Exception as e:
-                print(f"Error fetching user age: {e}")
-            finally:
-                if conn:
-                    conn.close()
+        if self.session and page_name not in LOGIN_PAGES:
+            user_age = self.session.age
 
         if user_age:
             if page_name == "complex":
@@ -137,75 +233,78 @@ class App(tk.Tk):
                 messagebox.showwarning("⚠️ Suggestion", "You're advised to follow SIMPLE exercises due to your age.")
                 return
 
-        page = None
-        if page_name == "login_signup":
-            page = LoginSignupPage(self.scrollable_frame, self)
-            self.disable_sidebar_buttons()
-        elif page_name == "create_account":
-            page = CreateAccountPage(self.scrollable_frame, self)
+        if page_name in PAGES and page_name not in LOGIN_PAGES and self.logged_in_user_id is None:
+            messagebox.showwarning("Access Denied", "Please login to access this page.")
+            self.show_page("login_signup")
+            return
+
+        self._hide_current_page()
+        if page_name in LOGIN_PAGES:
+            self.session = None
+            self.clear_page_cache()  # built pages belong to the user who was logged in
             self.disable_sidebar_buttons()
         elif page_name == "home":
-            if self.logged_in_user_id is None:
-                messagebox.showwarning("Access Denied", "Please login to access this page.")
-                self.show_page("login_signup")
-                return
-            page = HomePage(self.scrollable_frame, self)
             self.enable_sidebar_buttons()
-        elif page_name == "simple":
-            if self.logged_in_user_id is None:
-                messagebox.showwarning("Access Denied", "Please login to access this page.")
-                self.show_page("login_signup")
-                return
-            page = SimplePage(self.scrollable_frame, self)
-        elif page_name == "medium":
-            if self.logged_in_user_id is None:
-                messagebox.showwarning("Access Denied", "Please login to access this page.")
-                self.show_page("login_signup")
-                return
-            page = MediumPage(self.scrollable_frame, self)
-        elif page_name == "complex":
-            if self.logged_in_user_id is None:
-                messagebox.showwarning("Access Denied", "Please login to access this page.")
-                self.show_page("login_signup")
-                return
-            page = ComplexPage(self.scrollable_frame, self)
-        elif page_name == "user":
-            if self.logged_in_user_id is None:
-                messagebox.showwarning("Access Denied", "Please login to access this page.")
-                self.show_page("login_signup")
-                return
-            page = UserPage(self.scrollable_frame, self)
-        elif page_name == "workout":
-            if self.logged_in_user_id is None:
-                messagebox.showwarning("Access Denied", "Please login to access this page.")
-                self.show_page("login_signup")
-                return
-            page = WorkoutPage(self.scrollable_frame, self)
-        elif page_name == "progress":
-            if self.logged_in_user_id is None:
-                messagebox.showwarning("Access Denied", "Please login to access this page.")
-                self.show_page("login_signup")
-                return
-            page = ProgressPage(self.scrollable_frame, self)
-        elif page_name == "recommendations":
-            if self.logged_in_user_id is None:
-                messagebox.showwarning("Access Denied", "Please login to access this page.")
-                self.show_page("login_signup")
-                return
-            page = RecommendationsPage(self.scrollable_frame, self)
-        elif page_name == "settings":
-            if self.logged_in_user_id is None:
-                messagebox.showwarning("Access Denied", "Please login to access this page.")
-                self.show_page("login_signup")
-                return
-            page = SettingsPage(self.scrollable_frame, self)
-        else:
-            page = tk.Label(self.scrollable_frame, text="Page not found", font=("Arial", 16))
 
-        if page:
+        # --- Revisit: show the live page and let it update what changed ---
+        page = self._pages.get(page_name)
+        if page is not None:
+            self._pages.move_to_end(page_name)
+            page.pack(fill="both", expand=True)
+            if hasattr(page, "refresh"):
+                page.refresh()
+        else:
+            page_class = self._page_class(page_name)
+            if page_class is None:
+                page = tk.Label(self.scrollable_frame, text="Page not found", font=("Arial", 16))
+            else:
+                page = page_class(self.scrollable_frame, self)
             page.pack(fill="both", expand=True)
+            if page_class is not None and page_name not in LOGIN_PAGES:
+                self._cache_page(page_name, page)
+
+        self._current_page = page
+        self._current_page_name = page_name
         self.canvas.yview_moveto(0)
 
+        if self.session and not self._warmed_up:
+            self._warmed_up = True
+            self.loader.load(self._background, lambda: startup.warm_up(WARM_UP_AFTER_LOGIN), lambda _: None)
+
+        # Cached pages keep their colours, so only re-theme after a theme change
+        if self._page_themes.get(page_name) != self.current_theme_colors["theme_name"]:
+            self._theme_page(page)
+            self._page_themes[page_name] = self.current_theme_colors["theme_name"]
+
+    def _hide_current_page(self):
+        page = self._current_page
+        if page is None:
+            return
+        if self._pages.get(self._current_page_name) is page:
+            page.pack_forget()
+        else:
+            page.destroy()
+            self._page_themes.pop(self._current_page_name, None)
+        self._current_page = None
+        self._current_page_name = None
+
+    def _cache_page(self, page_name, page):
+        self._pages[page_name] = page
+        while len(self._pages) > MAX_CACHED_PAGES:
+            evicted_name, evicted = self._pages.popitem(last=False)
+            evicted.destroy()  # also cancels its pending loads
+            self._page_themes.pop(evicted_name, None)
+
+    def clear_page_cache(self):
+        for page_name, page in list(self._pages.items()):
+            if page is self._current_page:
+                self._current_page = None
+                self._current_page_name = None
+            page.destroy()
+            self._page_themes.pop(page_name, None)
+        self._pages.clear()
+
+    def _theme_page(self, page):
         if hasattr(page, 'apply_theme'):
             page.apply_theme(self.current_theme_colors['bg_color'], 
                              self.current_theme_colors['fg_color'], 
@@ -289,17 +388,24 @@ class App(tk.Tk):
         self.canvas.config(bg=self.current_theme_colors['bg_color'])
         self.scrollable_frame.config(bg=self.current_theme_colors['bg_color'])
 
-        current_page_widgets = self.scrollable_frame.winfo_children()
-        if current_page_widgets:
-            self._apply_theme_to_widgets(current_page_widgets[0], 
+        # Hidden cached pages pick the new theme up when they are next shown
+        self._page_themes.clear()
+        if self._current_page is not None:
+            self._apply_theme_to_widgets(self._current_page, 
                                          self.current_theme_colors['bg_color'], 
                                          self.current_theme_colors['fg_color'], 
                                          self.current_theme_colors['button_bg'], 
                                          self.current_theme_colors['button_fg'], 
                                          self.current_theme_colors['frame_bg'])
+            self._page_themes[self._current_page_name] = self.current_theme_colors['theme_name']
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Urban Yogi Lifestyle exercise tracker.")
+    parser.add_argument("--startup-report", action="store_true",
+                        help="print import times and the time to first paint")
+    startup.enabled = parser.parse_args().startup_report
+
     app = App()
     app.mainloop()
 
@@ -0,0 +1,49 @@
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.features import build_feature_store
+from utils.recommender import rank_names
+from utils.synthetic import body_parts, synthetic_catalog
+
+parser = argparse.ArgumentParser(
+    description="Time one similarity request, and the completed-rows bitset, against synthetic catalogs "
+                "of growing size and number of distinct feature sets.")
+parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000], help="catalog sizes to try")
+parser.add_argument("--body-parts", type=int, nargs="+", default=[40, 400, 4_000],
+                    help="body parts to draw from; the catalog has at most 36x this many signatures "
+                         "(default: 40 400 4000)")
+parser.add_argument("--requests", type=int, default=200, help="requests timed per size (default: 200)")
+parser.add_argument("--completed", type=int, default=1_000, help="names each simulated user has completed, at most half the catalog's (default: 1000)")
+parser.add_argument("--top-k", type=int, default=5, help="recommendations per request (default: 5)")
+args = parser.parse_args()
+
+rnd = random.Random(42)
+print(f"{'exercises':>10} {'parts':>6} {'signatures':>11} {'build s':>8} {'per request ms':>15} {'name_bits ms':>13}")
+for size in args.sizes:
+    for parts in args.body_parts:
+        start = time.perf_counter()
+        store = build_feature_store(synthetic_catalog(size, rnd, body_parts(parts)))
+        build_time = time.perf_counter() - start
+
+        profiles = [np.random.default_rng(i).random(len(store.classes)) for i in range(args.requests)]
+        completed = min(args.completed, len(store.unique_names) // 2)  # leave something to recommend
+        excluded = [set(rnd.sample(range(len(store.unique_names)), completed)) for _ in range(args.requests)]
+
+        start = time.perf_counter()
+        for profile, codes in zip(profiles, excluded):
+            rank_names(store, profile, codes, args.top_k)
+        per_request = (time.perf_counter() - start) / args.requests * 1000
+
+        # What the rule-based strategies pay to turn a history into a row bitset
+        start = time.perf_counter()
+        for codes in excluded:
+            store.name_bits(codes)
+        per_bitset = (time.perf_counter() - start) / args.requests * 1000
+
+        print(f"{size:>10} {parts:>6} {len(store.sig_norms):>11} {build_time:>8.2f} {per_request:>15.3f} {per_bitset:>13.3f}")
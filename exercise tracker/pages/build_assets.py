@@ -0,0 +1,20 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.assets import ASSET_PATH, asset_store, build_asset_store
+
+parser = argparse.ArgumentParser(description="Build the pre-sized thumbnail store the pages load images from.")
+parser.add_argument("--force", action="store_true", help="rebuild even if no source image changed")
+args = parser.parse_args()
+
+start = time.perf_counter()
+if args.force:
+    index = build_asset_store()
+    print(f"✅ Built {len(index['entries'])} thumbnail(s) into {ASSET_PATH} in {time.perf_counter() - start:.2f}s.")
+elif asset_store.ensure():
+    print(f"✅ Rebuilt {ASSET_PATH} in {time.perf_counter() - start:.2f}s.")
+else:
+    print(f"{ASSET_PATH} is up to date.")
@@ -0,0 +1,62 @@
+import argparse
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.db import DB_PATH, get_connection, close_all
+from utils.features import get_feature_store, profile_vector
+from utils.activity import get_user_profile
+from utils.rec_cache import invalidate_recommendations
+from utils.recommender import get_recommendations
+
+parser = argparse.ArgumentParser(
+    description="Check the NumPy recommender against the original pandas/scikit-learn one, user by user.")
+parser.add_argument("--db", default=DB_PATH, help=f"database to read (default: {DB_PATH})")
+parser.add_argument("--top-k", type=int, nargs="+", default=[3, 5], help="result sizes to compare (default: 3 5)")
+parser.add_argument("--seed", type=int, default=0, help="seed for the random strategies (default: 0)")
+args = parser.parse_args()
+
+cursor = get_connection(args.db).cursor()
+cursor.execute("SELECT id FROM user_profile ORDER BY id")
+user_ids = [row[0] for row in cursor.fetchall()]
+store = get_feature_store(args.db)
+
+
+def name_score(user_id, name):
+    profile = profile_vector(store, get_user_profile(cursor, user_id))
+    rows = [row for row, n in enumerate(store.names) if n == name]
+    return max(store.signature_scores(profile)[0][store.row_signature[rows]])
+
+
+def run(engine, user_id, k, medium_progress):
+    invalidate_recommendations()
+    np.random.seed(args.seed)
+    return get_recommendations(user_id, args.db, k, medium_progress=medium_progress, engine=engine)
+
+
+same = ties = mismatches = 0
+for user_id in user_ids:
+    for k in args.top_k:
+        # 0% medium progress never reaches the complex+simple rule, 100% lets it trigger
+        for medium_progress in (0.0, 100.0):
+            expected = run("reference", user_id, k, medium_progress)
+            actual = run("numpy", user_id, k, medium_progress)
+            if actual == expected:
+                same += 1
+                continue
+            # The reference breaks equal similarity scores in argsort order
+            if len(actual) == len(expected) and all(
+                    np.isclose(name_score(user_id, a[0]), name_score(user_id, e[0]))
+                    for a, e in zip(actual, expected)):
+                ties += 1
+                continue
+            mismatches += 1
+            print(f"❌ user {user_id}, k={k}, medium progress {medium_progress:.0f}%:")
+            print(f"   reference: {expected}")
+            print(f"   numpy:     {actual}")
+
+print(f"{same} identical, {ties} differing only in the order of equal scores, {mismatches} mismatched.")
+close_all()
+sys.exit(1 if mismatches else 0)
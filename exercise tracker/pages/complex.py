@@ -1,6 +1,5 @@
 import tkinter as tk
 import sqlite3
-from PIL import Image, ImageTk
 from tkinter import messagebox
 import winsound
 import threading
@@ -8,6 +7,9 @@ import time
 from tkinter import ttk
 import os
 import pygame.mixer
+from utils.write_queue import new_completion
+from utils.catalog import get_catalog
+from utils.images import show_image
 
 class ComplexPage(tk.Frame):
     def __init__(self, parent, controller):
@@ -15,12 +17,21 @@ class ComplexPage(tk.Frame):
         self.controller = controller
         self.goal = None
         self.exercises_by_part = {}
+        self.exercise_ids = {}
         self.count_var = tk.IntVar(value=0)
         self.energy_var = tk.StringVar(value="")
         self.current_page = "goal"
         self.current_part = None
+        self.catalog_version = get_catalog().version
         self.show_goal_selection()
 
+    def refresh(self):
+        # Keep the user where they were (a running timer included) unless
+        # the exercise lists on screen have since changed
+        if get_catalog().version != self.catalog_version:
+            self.catalog_version = get_catalog().version
+            self.show_goal_selection()
+
     def add_back_button(self):
         if self.current_page != "goal":
             tk.Button(self, text="← Back", bg="#f0f0f0", command=self.go_back).pack(anchor="nw", padx=10, pady=10)
@@ -53,24 +64,17 @@ class ComplexPage(tk.Frame):
 
     def load_exercises(self, goal):
         self.goal = goal
-        conn = None
         try:
-            conn = sqlite3.connect("fitness_app.db")
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT target_body_part, exercise_name, exercise_steps, min_count_duration, benefit
-                FROM exercises WHERE LOWER(focus_area)=? AND LOWER(exercise_type)='complex'
-            """, (goal,))
             self.exercises_by_part = {}
-            for row in cursor.fetchall():
-                self.exercises_by_part.setdefault(row[0], []).append(row[1:])
+            self.exercise_ids = {}
+            for ex in get_catalog().filter(focus_area=goal, exercise_type="complex"):
+                self.exercise_ids[ex.exercise_name] = ex.id
+                self.exercises_by_part.setdefault(ex.target_body_part, []).append(
+                    (ex.exercise_name, ex.exercise_steps, ex.min_count_duration, ex.benefit))
         except sqlite3.OperationalError as e:
             messagebox.showerror("Database Error", f"Failed to load exercises: {e}")
         except Exception as e:
             messagebox.showerror("Error", f"An unexpected error occurred: {e}")
-        finally:
-            if conn:
-                conn.close()
         self.show_body_parts()
 
     def show_body_parts(self):
@@ -81,9 +85,9 @@ class ComplexPage(tk.Frame):
         tk.Label(self, text="Select a Body Part", font=("Arial", 18, "bold"), bg="white").pack(pady=10)
         btn_frame = tk.Frame(self, bg="white"); btn_frame.pack()
         for idx, part in enumerate(self.exercises_by_part):
-            img = ImageTk.PhotoImage(Image.open(f"images/body_parts/{part.lower().replace(' ','_')}.png").resize((80,80)))
             card = tk.Frame(btn_frame, bd=1, relief="solid", bg="white"); card.grid(row=idx//4, column=idx%4, padx=20, pady=20)
-            tk.Label(card, image=img, bg="white").pack(); card.image=img
+            icon = tk.Label(card, bg="white"); icon.pack()
+            show_image(self.controller.loader, icon, f"images/body_parts/{part.lower().replace(' ','_')}.png", (80,80))
             tk.Button(card, text=part, width=15, bg="#f2f2f2", command=lambda p=part:self.show_exercises(p)).pack()
 
     def show_exercises(self, part):
@@ -192,31 +196,36 @@ class ComplexPage(tk.Frame):
             messagebox.showerror("⚠️ Error", "Please select energy level before submitting!")
             return
 
-        conn = None
+        energy_level = self.energy_var.get()
+        exercise_id = self.exercise_ids.get(name)
+
+        user_id = self.controller.logged_in_user_id
+        if not user_id:
+            messagebox.showerror("❌", "No user profile found. Please create one in User Info.")
+            return
+
+        record = new_completion(user_id, exercise_id, name, current_unix_timestamp,
+                                start_time_to_save, end_time_to_save, calculated_duration, reps, energy_level)
+
+        # The write-behind queue commits off the Tk thread; feedback arrives once it has
         try:
-            conn = sqlite3.connect("fitness_app.db")
-            cur = conn.cursor()
-            cur.execute("SELECT id FROM user_profile ORDER BY id DESC LIMIT 1")
-            user = cur.fetchone()
-            user_id = user[0] if user else None
-
-            if user_id:
-                cur.execute("""INSERT INTO completed_exercises
-                    (user_id, exercise_name, date_completed, start_time, end_time, duration, reps_completed, energy_level)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
-                    (user_id, name, current_unix_timestamp, start_time_to_save, end_time_to_save, calculated_duration, reps, self.energy_var.get()))
-                conn.commit()
-                self.count_var.set(self.count_var.get() + 1)
-                messagebox.showinfo("✅ Saved", "Exercise saved!")
-            else:
-                messagebox.showerror("❌", "No user profile found. Please create one in User Info.")
-        except sqlite3.OperationalError as e:
-            messagebox.showerror("Database Error", f"Failed to save exercise: {e}. Please try again.")
+            self.controller.completion_writer.submit(
+                record,
+                on_commit=lambda _: self.controller.run_on_ui(self.on_saved),
+                on_error=lambda e: self.controller.run_on_ui(self.on_save_failed, e),
+            )
         except Exception as e:
             messagebox.showerror("Error", f"An unexpected error occurred: {e}")
-        finally:
-            if conn:
-                conn.close()
+
+    def on_saved(self):
+        self.count_var.set(self.count_var.get() + 1)
+        messagebox.showinfo("✅ Saved", "Exercise saved!")
+
+    def on_save_failed(self, error):
+        if isinstance(error, sqlite3.OperationalError):
+            messagebox.showerror("Database Error", f"Failed to save exercise: {error}. It will be retried on next start.")
+        else:
+            messagebox.showerror("Error", f"An unexpected error occurred: {error}")
 
 class Timer(tk.Frame):
     def __init__(self, parent):
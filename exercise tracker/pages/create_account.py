@@ -2,6 +2,7 @@ import tkinter as tk
 import sqlite3
 from tkinter import messagebox
 import hashlib
+from utils.db import run_in_transaction
 
 class CreateAccountPage(tk.Frame):
     def __init__(self, parent, controller):
@@ -75,22 +76,24 @@ class CreateAccountPage(tk.Frame):
 
             hashed_password = self.hash_password(password)
 
-            conn = None
-            try:
-                conn = sqlite3.connect("fitness_app.db")
+            def insert_user(conn):
                 cursor = conn.cursor()
-
                 cursor.execute("SELECT id FROM user_profile WHERE phone_number = ?", (phone,))
                 if cursor.fetchone():
-                    messagebox.showerror("Error", "Phone number already registered. Please login.")
-                    return
+                    return False
 
                 # Removed fitness_goal from INSERT query
                 cursor.execute("""
                     INSERT INTO user_profile (name, age, gender, phone_number, password)
                     VALUES (?, ?, ?, ?, ?)
                 """, (name, age, gender, phone, hashed_password))
-                conn.commit()
+                return True
+
+            try:
+                if not run_in_transaction(insert_user):
+                    messagebox.showerror("Error", "Phone number already registered. Please login.")
+                    return
+
                 messagebox.showinfo("Success", "Account created successfully! Please login.")
                 self.controller.show_page("login_signup")
 
@@ -100,9 +103,6 @@ class CreateAccountPage(tk.Frame):
                 messagebox.showerror("Database Error", f"Database error during registration: {e}")
             except Exception as e:
                 messagebox.showerror("Error", f"An unexpected error occurred: {e}")
-            finally:
-                if conn:
-                    conn.close()
 
         except ValueError:
             messagebox.showerror("Error", "Age must be a number.")
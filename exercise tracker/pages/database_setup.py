@@ -1,65 +1,53 @@
-import sqlite3
-
-conn = sqlite3.connect("fitness_app.db")
-cursor = conn.cursor()
-
-cursor.execute("DROP TABLE IF EXISTS exercises")
-cursor.execute("DROP TABLE IF EXISTS user_profile")
-cursor.execute("DROP TABLE IF EXISTS workout_plan")
-cursor.execute("DROP TABLE IF EXISTS completed_exercises")
-
-cursor.execute("""
-CREATE TABLE IF NOT EXISTS exercises (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    focus_area TEXT,
-    exercise_type TEXT,
-    target_body_part TEXT,
-    exercise_name TEXT,
-    exercise_steps TEXT,
-    min_count_duration TEXT,
-    benefit TEXT
-)
-""")
-
-cursor.execute("""
-CREATE TABLE IF NOT EXISTS user_profile (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    name TEXT NOT NULL,
-    age INTEGER,
-    gender TEXT,
-    phone_number TEXT UNIQUE,
-    password TEXT NOT NULL
-    -- fitness_goal TEXT -- Removed this column
-)
-""")
-
-cursor.execute("""
-CREATE TABLE IF NOT EXISTS workout_plan (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    day TEXT,
-    body_part TEXT,
-    focus_area TEXT,
-    exercise_type TEXT
-)
-""")
-
-cursor.execute("""
-CREATE TABLE IF NOT EXISTS completed_exercises (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    user_id INTEGER,
-    exercise_name TEXT,
-    date_completed INTEGER DEFAULT (strftime('%s','now')),
-    start_time INTEGER,
-    end_time INTEGER,
-    duration INTEGER,
-    reps_completed INTEGER,
-    energy_level TEXT
-)
-""")
-conn.commit()
-conn.close()
-
-
-print("Database schema updated successfully!")
-
-
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.db import get_connection, close_all, run_in_transaction
+from utils.activity import rebuild_daily_activity, recompute_streaks, rebuild_user_profiles
+from utils.cooccurrence import rebuild_item_index
+from utils.migrations import migrate, check_query_plans, SCHEMA_VERSION
+
+parser = argparse.ArgumentParser(description="Create or upgrade the fitness_app.db schema.")
+parser.add_argument("--reset", action="store_true",
+                    help="drop every table first (destroys all data) and rebuild from scratch")
+parser.add_argument("--rebuild-activity", action="store_true",
+                    help="regenerate the daily_activity rollup, user streaks, feature profiles and "
+                         "the co-occurrence index from completed_exercises")
+args = parser.parse_args()
+
+if args.reset:
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'")
+    for (table,) in cursor.fetchall():
+        cursor.execute(f"DROP TABLE IF EXISTS {table}")
+    cursor.execute("PRAGMA user_version = 0")
+    conn.commit()
+
+applied = migrate()
+if applied:
+    print(f"Applied migrations {applied}, schema is now at version {SCHEMA_VERSION}.")
+else:
+    print(f"Schema already at version {SCHEMA_VERSION}, nothing to do.")
+
+def rebuild_activity(conn):
+    cursor = conn.cursor()
+    rebuild_daily_activity(cursor)
+    recompute_streaks(cursor)
+    rebuild_user_profiles(cursor)
+    rebuild_item_index(cursor)
+
+if args.rebuild_activity:
+    run_in_transaction(rebuild_activity)
+    print("Rebuilt daily_activity, user_streaks, user_feature_profile and the co-occurrence index.")
+
+problems = check_query_plans()
+if problems:
+    for name, steps in problems.items():
+        print(f"❌ {name} does a full scan: {'; '.join(steps)}")
+    close_all()
+    sys.exit(1)
+
+print("✅ Every hot query is served by an index.")
+close_all()
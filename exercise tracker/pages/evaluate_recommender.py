@@ -0,0 +1,207 @@
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.db import close_all, run_in_transaction
+from utils.activity import record_completion
+from utils.catalog import get_catalog
+from utils.cooccurrence import refresh_item_neighbors
+from utils.migrations import migrate, SCHEMA_VERSION
+from utils.rec_cache import invalidate_recommendations
+from utils.recommender import get_recommendations
+from utils.synthetic import FOCUS_AREAS, BODY_PARTS, synthetic_rows
+
+parser = argparse.ArgumentParser(
+    description="Replay synthetic users through every recommendation strategy and report "
+                "latency, peak memory and hit rate as JSON.")
+parser.add_argument("--exercises", type=int, default=500, help="catalog rows to generate (default: 500)")
+parser.add_argument("--users", type=int, default=200, help="users with a history (default: 200)")
+parser.add_argument("--new-users", type=int, default=50, help="users with no history yet (default: 50)")
+parser.add_argument("--history", type=int, default=30, help="completions per user (default: 30)")
+parser.add_argument("--holdout", type=int, default=5, help="most recent completions held out per user (default: 5)")
+parser.add_argument("--top-k", type=int, default=5, help="recommendations per request (default: 5)")
+parser.add_argument("--seed", type=int, default=0, help="seed for the data and the random strategies (default: 0)")
+parser.add_argument("--output", help="write the JSON report here instead of stdout")
+parser.add_argument("--keep-db", action="store_true", help="leave the generated database in place")
+args = parser.parse_args()
+
+if args.holdout >= args.history:
+    parser.error("--holdout must be smaller than --history")
+
+ENERGY_LEVELS = ["High", "High", "High", "Medium", "Low"]
+TASTE_SHARE = 0.8  # share of a user's completions drawn from what they like
+
+# Strategy -> the get_recommendations arguments that select it. "progress"
+# lets the complex+simple rule fire for users whose last week qualifies;
+# "new_user" is replayed on users with nothing recorded.
+STRATEGIES = {
+    "content": {"mode": "content"},
+    "collaborative": {"mode": "collaborative"},
+    "progress": {"simple_progress": 100.0, "medium_progress": 100.0},
+    "new_user": {},
+}
+
+
+# --- Synthetic data ---
+
+def synthetic_history(catalog, rnd, length):
+    """One user's completions, oldest first: mostly one focus area and a few body parts."""
+    focus = rnd.choice(FOCUS_AREAS)
+    parts = set(rnd.sample(BODY_PARTS, 3))
+    liked = [e for e in catalog.exercises if e.focus_area == focus or e.target_body_part in parts]
+    now = int(time.time())
+    history = []
+    for step in range(length):
+        pool = liked if liked and rnd.random() < TASTE_SHARE else catalog.exercises
+        completed_at = now - (length - step) * 86400 // 2  # two a day, ending today
+        history.append((rnd.choice(pool), completed_at, rnd.choice(ENERGY_LEVELS)))
+    return history
+
+
+def build_database(db_path, rnd):
+    """Create the synthetic database; returns {user_id: held-out names} for the replay."""
+    migrate(db_path)
+    run_in_transaction(lambda conn: conn.executemany("""
+        INSERT INTO exercises (focus_area, exercise_type, target_body_part, exercise_name,
+                               exercise_steps, min_count_duration, benefit)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """, synthetic_rows(args.exercises, rnd)), db_path)
+    catalog = get_catalog(db_path)
+
+    held_out = {}
+
+    def fill(conn):
+        for user_id in range(1, args.users + args.new_users + 1):
+            conn.execute("""
+                INSERT INTO user_profile (id, name, age, gender, phone_number, password)
+                VALUES (?, ?, ?, 'Other', ?, 'x')
+            """, (user_id, f"User {user_id}", rnd.randint(18, 80), f"000{user_id:07d}"))
+
+            history = synthetic_history(catalog, rnd, args.history)
+            # New users are scored against their first completions, everyone
+            # else against their last ones
+            if user_id > args.users:
+                train, test = [], history[:args.holdout]
+            else:
+                train, test = history[:-args.holdout], history[-args.holdout:]
+
+            for exercise, completed_at, energy_level in train:
+                record_completion(conn, user_id, exercise.id, exercise.exercise_name,
+                                  completed_at, completed_at, completed_at + 60, 60, 10, energy_level)
+            # Completed names are never recommended again, so they cannot count as hits
+            trained = {exercise.exercise_name for exercise, _, _ in train}
+            held_out[user_id] = {exercise.exercise_name for exercise, _, _ in test} - trained
+        # What the nightly job would have done, so requests see fresh neighbor lists
+        refresh_item_neighbors(conn.cursor())
+
+    run_in_transaction(fill, db_path)
+    return held_out
+
+
+# --- Replay ---
+
+def request(db_path, user_id, options):
+    invalidate_recommendations()
+    start = time.perf_counter()
+    recs = get_recommendations(user_id, db_path, args.top_k, **options)
+    return recs, (time.perf_counter() - start) * 1000
+
+
+def percentiles(values):
+    p50, p95, p99 = np.percentile(values, [50, 95, 99]) if values else (0.0, 0.0, 0.0)
+    return {"p50": round(float(p50), 3), "p95": round(float(p95), 3), "p99": round(float(p99), 3),
+            "mean": round(float(np.mean(values)), 3) if values else 0.0}
+
+
+def evaluate(db_path, strategy, user_ids, held_out, catalog_names):
+    options = STRATEGIES[strategy]
+
+    np.random.seed(args.seed)
+    latencies, cached_latencies = [], []
+    hits = recall_sum = evaluated = 0
+    recommended = set()
+    for user_id in user_ids:
+        recs, elapsed = request(db_path, user_id, options)
+        latencies.append(elapsed)
+
+        start = time.perf_counter()
+        get_recommendations(user_id, db_path, args.top_k, **options)
+        cached_latencies.append((time.perf_counter() - start) * 1000)
+
+        names = {name for name, _ in recs} & catalog_names  # drops "Complete your first exercise..." notices
+        recommended |= names
+        relevant = held_out[user_id]
+        if relevant:
+            evaluated += 1
+            found = len(names & relevant)
+            hits += found > 0
+            recall_sum += found / len(relevant)
+
+    # Memory is measured on its own pass: tracemalloc slows every allocation
+    np.random.seed(args.seed)
+    tracemalloc.start()
+    for user_id in user_ids:
+        request(db_path, user_id, options)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "users": len(user_ids),
+        "latency_ms": percentiles(latencies),
+        "cached_latency_ms": percentiles(cached_latencies),
+        "peak_memory_kib": round(peak / 1024, 1),
+        "evaluated_users": evaluated,
+        "hit_rate": round(hits / evaluated, 4) if evaluated else None,
+        "recall": round(recall_sum / evaluated, 4) if evaluated else None,
+        "coverage": round(len(recommended) / len(catalog_names), 4) if catalog_names else None,
+    }
+
+
+workdir = tempfile.mkdtemp(prefix="recommender-eval-")
+db_path = os.path.join(workdir, "eval.db")
+try:
+    rnd = random.Random(args.seed)
+    start = time.perf_counter()
+    held_out = build_database(db_path, rnd)
+    build_time = time.perf_counter() - start
+
+    catalog_names = set(get_catalog(db_path).by_name)
+    returning = list(range(1, args.users + 1))
+    new = list(range(args.users + 1, args.users + args.new_users + 1))
+
+    report = {
+        "config": {key: getattr(args, key) for key in
+                   ("exercises", "users", "new_users", "history", "holdout", "top_k", "seed")},
+        "environment": {"python": platform.python_version(), "numpy": np.__version__,
+                        "schema_version": SCHEMA_VERSION},
+        "build_seconds": round(build_time, 2),
+        "catalog_names": len(catalog_names),
+        "strategies": {
+            strategy: evaluate(db_path, strategy, new if strategy == "new_user" else returning,
+                               held_out, catalog_names)
+            for strategy in STRATEGIES
+        },
+    }
+finally:
+    close_all()
+    if args.keep_db:
+        print(f"Kept {db_path}", file=sys.stderr)
+    else:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+text = json.dumps(report, indent=2, sort_keys=True)
+if args.output:
+    with open(args.output, "w") as f:
+        f.write(text + "\n")
+else:
+    print(text)
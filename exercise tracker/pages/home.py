@@ -1,10 +1,7 @@
 import tkinter as tk
-from PIL import Image, ImageTk
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import sqlite3
-from datetime import datetime, timedelta, time as dt_time
-from utils.recommender import get_recommendations
+from utils.db import get_connection
+from utils.catalog import get_catalog
+from utils.images import show_image
 from tkinter import ttk
 
 
@@ -13,26 +10,114 @@ class HomePage(tk.Frame):
         super().__init__(parent, bg="white")
         self.controller = controller
 
-        user_name = "User"
+        # --- UI Layout ---
+        main_content_frame = ttk.Frame(self, padding="30 30 30 30")
+        main_content_frame.pack(expand=True, fill="both")
+
+        # Top Section: Welcome (Left) + Recommendations Table (Right)
+        top_section_frame = ttk.Frame(main_content_frame)
+        top_section_frame.pack(fill="x", pady=(0, 20))
+
+        # Left: Welcome Message
+        welcome_frame = ttk.Frame(top_section_frame)
+        welcome_frame.pack(side="left", fill="both", expand=True, padx=(0, 20))
+
+        self.full_text = ""
+        self.animated_label = ttk.Label(welcome_frame, text="Loading your progress...", font=("Arial", 28, "bold"))
+        self.animated_label.pack(pady=(0, 10), anchor="w")
+
+        self.animate_index = 0
+        self.animating = False
+        self.shown_data = None
+
+        # Right: Recommendations Table
+        rec_frame = ttk.Frame(top_section_frame, relief="solid", borderwidth=1, padding="10 10 10 10")
+        rec_frame.pack(side="right", fill="both", expand=True)
+
+        ttk.Label(
+            rec_frame,
+            text="Your Personalized Recommendations",
+            font=("Arial", 16, "bold"),
+            foreground="green"
+        ).pack(pady=(0, 10))
+
+        # Table
+        table_frame = tk.Frame(rec_frame, bg="white")
+        table_frame.pack(fill="both", expand=True)
+        self.table_frame = table_frame
+
+        headers = ["Category", "Exercise Name", "Action"]
+        for col, header in enumerate(headers):
+            tk.Label(
+                table_frame,
+                text=header,
+                font=("Arial", 12, "bold"),
+                bg="#e6e6e6",
+                relief="solid",
+                borderwidth=1,
+                width=20
+            ).grid(row=0, column=col, sticky="nsew")
+
+        for col in range(3):
+            table_frame.grid_columnconfigure(col, weight=1)
+
+        self.recs_placeholder = tk.Label(table_frame, text="Loading recommendations...",
+                                         font=("Arial", 11), bg="white", fg="gray")
+        self.recs_placeholder.grid(row=1, column=0, columnspan=3, pady=10)
+
+        # Levels (below)
+        ttk.Label(
+            main_content_frame,
+            text="What would you like to do today?",
+            font=("Arial", 22, "bold"),
+        ).pack(pady=(20, 25), anchor="center")
+
+        levels_frame = ttk.Frame(main_content_frame)
+        levels_frame.pack(pady=(0, 20), anchor="center")
+        self.levels_frame = levels_frame
+
+        levels = [
+            ("Simple", f"images/simple.png", "simple"),
+            ("Medium", f"images/medium.png", "medium"),
+            ("Complex", f"images/complex.png", "complex"),
+        ]
+        self.level_labels = {}
+
+        for label_text, img_path, page_name in levels:
+            card_frame = ttk.Frame(levels_frame, relief="raised", padding="10 10 10 10")
+            card_frame.pack(side="left", padx=30, expand=True)
+
+            card_button = tk.Button(card_frame, command=lambda p=page_name: controller.show_page(p), bd=0)
+            card_button.pack(pady=(0, 5))
+            show_image(controller.loader, card_button, img_path, (200, 140))
+            level_label = ttk.Label(card_frame, text=f"{label_text} (…%)", font=("Arial", 12))
+            level_label.pack(pady=(0, 10))
+            self.level_labels[page_name] = (label_text, level_label)
+
+        # SQL and the recommender run on the loader pool, not the Tk thread
+        self.refresh()
+
+    def refresh(self):
+        session = self.controller.session
+        user_id = session.user_id if session else None
+        user_name = session.name if session else "User"
+        self.controller.loader.load(self, lambda: self.fetch_home_data(user_id, user_name), self.show_home_data)
+
+    def fetch_home_data(self, user_id, user_name):
+        # Runs on a loader thread: no widget access here. NumPy comes in with
+        # the recommender, so it is imported here rather than with the page.
+        from utils.recommender import get_recommendations
+
         overall_progress_percentage = 0.0
         simple_progress_percentage = 0.0
         medium_progress_percentage = 0.0
         complex_progress_percentage = 0.0
 
-        conn = None
         try:
-            conn = sqlite3.connect("fitness_app.db")
-            cursor = conn.cursor()
-
-            user_id = self.controller.logged_in_user_id
-            if user_id:
-                cursor.execute("SELECT name FROM user_profile WHERE id = ?", (user_id,))
-                user_data = cursor.fetchone()
-                if user_data:
-                    user_name = user_data[0]
+            cursor = get_connection().cursor()
+            catalog = get_catalog()
 
-            cursor.execute("SELECT COUNT(DISTINCT exercise_name) FROM exercises")
-            total_unique_exercises_overall = cursor.fetchone()[0]
+            total_unique_exercises_overall = catalog.count_names()
 
             if user_id and total_unique_exercises_overall > 0:
                 cursor.execute(
@@ -49,11 +134,7 @@ class HomePage(tk.Frame):
                 if not user_id:
                     return 0.0
 
-                cursor.execute(
-                    "SELECT COUNT(DISTINCT exercise_name) FROM exercises WHERE LOWER(exercise_type) = ?",
-                    (exercise_type,),
-                )
-                total_type_exercises = cursor.fetchone()[0]
+                total_type_exercises = catalog.count_names(exercise_type)
 
                 if total_type_exercises == 0:
                     return 0.0
@@ -62,8 +143,8 @@ class HomePage(tk.Frame):
                     """
                     SELECT COUNT(DISTINCT ce.exercise_name)
                     FROM completed_exercises ce
-                    JOIN exercises e ON ce.exercise_name = e.exercise_name
-                    WHERE ce.user_id = ? AND LOWER(e.exercise_type) = ?
+                    JOIN exercises e ON e.id = ce.exercise_id
+                    WHERE ce.user_id = ? AND e.exercise_type = ? COLLATE NOCASE
                 """,
                     (user_id, exercise_type),
                 )
@@ -77,41 +158,40 @@ class HomePage(tk.Frame):
 
         except Exception as e:
             print(f"Error on Home Page: {e}")
-        finally:
-            if conn:
-                conn.close()
 
-        # --- UI Layout ---
-        main_content_frame = ttk.Frame(self, padding="30 30 30 30")
-        main_content_frame.pack(expand=True, fill="both")
+        return {
+            "user_name": user_name,
+            "overall": overall_progress_percentage,
+            "simple": simple_progress_percentage,
+            "medium": medium_progress_percentage,
+            "complex": complex_progress_percentage,
+            "recs": get_recommendations(user_id),
+        }
 
-        # Top Section: Welcome (Left) + Recommendations Table (Right)
-        top_section_frame = ttk.Frame(main_content_frame)
-        top_section_frame.pack(fill="x", pady=(0, 20))
+    def show_home_data(self, data):
+        if data == self.shown_data:
+            return  # nothing changed since the page was last drawn
+        self.shown_data = data
 
-        # Left: Welcome Message
-        welcome_frame = ttk.Frame(top_section_frame)
-        welcome_frame.pack(side="left", fill="both", expand=True, padx=(0, 20))
+        full_text = f"Welcome, {data['user_name']}!... (Your Progress % : {data['overall']})"
+        if full_text != self.full_text:
+            self.full_text = full_text
+            self.animate_index = 0
+            if not self.animating:
+                self.animate_text()
 
-        self.full_text = f"Welcome, {user_name}!... (Your Progress % : {overall_progress_percentage})"
-        self.animated_label = ttk.Label(welcome_frame, text="", font=("Arial", 28, "bold"))
-        self.animated_label.pack(pady=(0, 10), anchor="w")
+        for page_name, (label_text, level_label) in self.level_labels.items():
+            level_label.config(text=f"{label_text} ({data[page_name]}%)")
 
-        self.animate_index = 0
-        self.animate_text()
+        self.show_recommendations(data["recs"])
 
-        # Right: Recommendations Table
-        rec_frame = ttk.Frame(top_section_frame, relief="solid", borderwidth=1, padding="10 10 10 10")
-        rec_frame.pack(side="right", fill="both", expand=True)
-
-        ttk.Label(
-            rec_frame,
-            text="Your Personalized Recommendations",
-            font=("Arial", 16, "bold"),
-            foreground="green"
-        ).pack(pady=(0, 10))
+    def show_recommendations(self, recs):
+        table_frame = self.table_frame
 
-        recs = get_recommendations(self.controller.logged_in_user_id)
+        # Drop the placeholder or the previous rows, keeping the header
+        for widget in table_frame.grid_slaves():
+            if int(widget.grid_info()["row"]) > 0:
+                widget.destroy()
 
         # Parse into (exercise_name, type)
         parsed_recs = []
@@ -125,22 +205,6 @@ class HomePage(tk.Frame):
                 else:
                     parsed_recs.append((r.strip(), "Unknown"))
 
-        # Table
-        table_frame = tk.Frame(rec_frame, bg="white")
-        table_frame.pack(fill="both", expand=True)
-
-        headers = ["Category", "Exercise Name", "Action"]
-        for col, header in enumerate(headers):
-            tk.Label(
-                table_frame,
-                text=header,
-                font=("Arial", 12, "bold"),
-                bg="#e6e6e6",
-                relief="solid",
-                borderwidth=1,
-                width=20
-            ).grid(row=0, column=col, sticky="nsew")
-
         # Populate rows
         for i, (name, etype) in enumerate(parsed_recs, start=1):
             bg_color = "#ffffff" if i % 2 == 0 else "#f9f9f9"
@@ -176,49 +240,15 @@ class HomePage(tk.Frame):
             )
             btn.grid(row=i, column=2, sticky="nsew")
 
-        for col in range(3):
-            table_frame.grid_columnconfigure(col, weight=1)
-
-        # Levels (below)
-        ttk.Label(
-            main_content_frame,
-            text="What would you like to do today?",
-            font=("Arial", 22, "bold"),
-        ).pack(pady=(20, 25), anchor="center")
-
-        levels_frame = ttk.Frame(main_content_frame)
-        levels_frame.pack(pady=(0, 20), anchor="center")
-        self.levels_frame = levels_frame
-
-        levels = [
-            ("Simple", f"images/simple.png", "simple", simple_progress_percentage),
-            ("Medium", f"images/medium.png", "medium", medium_progress_percentage),
-            ("Complex", f"images/complex.png", "complex", complex_progress_percentage),
-        ]
-
-        for label_text, img_path, page_name, progress_val in levels:
-            img = Image.open(img_path)
-            img = img.resize((200, 140))
-            photo = ImageTk.PhotoImage(img)
-
-            card_frame = ttk.Frame(levels_frame, relief="raised", padding="10 10 10 10")
-            card_frame.pack(side="left", padx=30, expand=True)
-
-            tk.Button(
-                card_frame, image=photo, command=lambda p=page_name: controller.show_page(p), bd=0
-            ).pack(pady=(0, 5))
-            ttk.Label(card_frame, text=f"{label_text} ({progress_val}%)", font=("Arial", 12)).pack(
-                pady=(0, 10)
-            )
-
-            setattr(self, f"{label_text.lower()}_img", photo)
-
     def animate_text(self):
         if self.animate_index <= len(self.full_text):
             current = self.full_text[: self.animate_index]
             self.animated_label.config(text=current)
             self.animate_index += 1
+            self.animating = True
             self.after(100, self.animate_text)
+        else:
+            self.animating = False
 
     def apply_theme(self, bg_color, fg_color, button_bg, button_fg, frame_bg):
         self.config(bg=bg_color)
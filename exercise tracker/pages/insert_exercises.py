@@ -1,34 +1,36 @@
-import pandas as pd
-import sqlite3
-
-# Excel se data load karo
-df = pd.read_excel(r'pages/Wireframe_UYL - V1.xlsx', sheet_name='UYL Exercises')
-
-# Sirf required columns select karo aur rename karo
-df = df[['Sr. No.', 'Focus Area', 'Exercise Type', 'Target Body Part',
-         'Exercise Name', 'Exercise Steps', 'Minimum Count / Duration', 'Benefit']]
-
-df.columns = ['sr_no', 'focus_area', 'exercise_type', 'target_body_part',
-              'exercise_name', 'exercise_steps', 'min_count_duration', 'benefit']
-
-# Database me insert karo
-conn = sqlite3.connect("fitness_app.db")
-cursor = conn.cursor()
-
-for _, row in df.iterrows():
-    cursor.execute("""
-        INSERT INTO exercises 
-        (focus_area, exercise_type, target_body_part, exercise_name, exercise_steps, min_count_duration, benefit)
-        VALUES (?, ?, ?, ?, ?, ?, ?)
-    """, (
-        row['focus_area'], row['exercise_type'], row['target_body_part'],
-        row['exercise_name'], row['exercise_steps'], str(row['min_count_duration']), row['benefit']
-    ))
-
-conn.commit()
-conn.close()
-
-print("✅ All exercises inserted successfully!")
-
-
-
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.db import close_all, run_in_transaction
+from utils.activity import rebuild_user_profiles
+from utils.migrations import migrate
+from utils.ingest import ingest_workbook, IngestError, WORKBOOK_PATH, SHEET_NAME
+
+parser = argparse.ArgumentParser(description="Load the exercise catalog from the workbook into fitness_app.db.")
+parser.add_argument("workbook", nargs="?", default=WORKBOOK_PATH, help=f"path to the .xlsx file (default: {WORKBOOK_PATH})")
+parser.add_argument("--sheet", default=SHEET_NAME, help=f"sheet to read (default: {SHEET_NAME})")
+parser.add_argument("--dry-run", action="store_true", help="report what would change without writing anything")
+args = parser.parse_args()
+
+migrate()  # the upsert needs the natural-key index
+
+try:
+    report = ingest_workbook(args.workbook, args.sheet, dry_run=args.dry_run)
+except (IngestError, FileNotFoundError) as e:
+    print(f"❌ {e}")
+    close_all()
+    sys.exit(1)
+
+for row_number, message in report["errors"]:
+    print(f"⚠️ Row {row_number} skipped: {message}")
+
+if not args.dry_run and (report["inserted"] or report["updated"]):
+    # Profiles hold catalog features, so they follow the catalog
+    run_in_transaction(lambda conn: rebuild_user_profiles(conn.cursor()))
+
+prefix = "Dry run: " if args.dry_run else "✅ "
+print(f"{prefix}{report['inserted']} inserted, {report['updated']} updated, "
+      f"{report['unchanged']} unchanged, {len(report['errors'])} rejected.")
+close_all()
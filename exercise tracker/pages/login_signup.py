@@ -2,6 +2,8 @@ import tkinter as tk
 import sqlite3
 from tkinter import messagebox
 import hashlib
+from utils.db import get_connection
+from utils.session import Session
 
 class LoginSignupPage(tk.Frame):
     def __init__(self, parent, controller):
@@ -49,16 +51,17 @@ class LoginSignupPage(tk.Frame):
 
         hashed_password = self.hash_password(password)
 
-        conn = None
         try:
-            conn = sqlite3.connect("fitness_app.db")
-            cursor = conn.cursor()
+            cursor = get_connection().cursor()
 
-            cursor.execute("SELECT id, name FROM user_profile WHERE phone_number = ? AND password = ?", (phone, hashed_password))
+            cursor.execute("""
+                SELECT id, name, age, gender, phone_number FROM user_profile
+                WHERE phone_number = ? AND password = ?
+            """, (phone, hashed_password))
             user_data = cursor.fetchone()
 
             if user_data:
-                self.controller.logged_in_user_id = user_data[0]
+                self.controller.session = Session(*user_data)
                 messagebox.showinfo("Success", f"Welcome back, {user_data[1]}!")
                 self.controller.show_page("home")
             else:
@@ -68,7 +71,4 @@ class LoginSignupPage(tk.Frame):
             messagebox.showerror("Database Error", f"Database error during login: {e}")
         except Exception as e:
             messagebox.showerror("Error", f"An unexpected error occurred: {e}")
-        finally:
-            if conn:
-                conn.close()
 
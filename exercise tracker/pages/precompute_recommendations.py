@@ -0,0 +1,26 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.db import close_all, run_in_transaction
+from utils.cooccurrence import refresh_item_neighbors
+from utils.migrations import migrate
+from utils.recommender import get_recommendations_batch
+
+parser = argparse.ArgumentParser(description="Precompute similarity-based recommendations into user_recommendations.")
+parser.add_argument("--users", type=int, nargs="+", help="only these user ids (default: every user)")
+parser.add_argument("--top-k", type=int, default=5, help="recommendations to store per user (default: 5)")
+args = parser.parse_args()
+
+migrate()
+
+start = time.perf_counter()
+# Neighbor lists touched since the last run, so collaborative requests find them fresh
+run_in_transaction(lambda conn: refresh_item_neighbors(conn.cursor()))
+scored = get_recommendations_batch(args.users, num_recommendations=args.top_k)
+elapsed = time.perf_counter() - start
+
+print(f"✅ Stored recommendations for {scored} user(s) in {elapsed:.1f}s.")
+close_all()
@@ -1,8 +1,9 @@
 import tkinter as tk
-import sqlite3
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from datetime import datetime, timedelta
+from utils.db import get_connection
+from utils.activity import bucket_activity, add_months, get_streaks
 
 
 class ProgressPage(tk.Frame):
@@ -10,10 +11,15 @@ class ProgressPage(tk.Frame):
         super().__init__(parent, bg="white")
         self.controller = controller
         self.user_id = self.controller.logged_in_user_id
+        self.shown_data = None
 
         self.create_widgets()
-        self.load_monthly_progress()
-        self.load_weekly_progress()  # <-- add weekly chart
+        self.refresh()
+
+    def refresh(self):
+        if self.user_id:
+            self.controller.loader.load(self, self.fetch_progress_data, self.show_progress_data,
+                                        on_error=self.show_load_error)
 
     def create_widgets(self):
         for widget in self.winfo_children():
@@ -57,81 +63,79 @@ class ProgressPage(tk.Frame):
         self.weekly_graph_frame = tk.Frame(self.main_frame, bg="white", bd=1, relief="solid")
         self.weekly_graph_frame.pack(pady=20, fill="both", expand=True)
 
-    def load_monthly_progress(self):
-        if not self.user_id:
-            return
-
-        conn = None
-        try:
-            conn = sqlite3.connect("fitness_app.db")
-            cursor = conn.cursor()
-            today = datetime.now().date()
-
-            monthly_data = {}
-            for i in range(6):
-                month_start_date = (today.replace(day=1) - timedelta(days=30 * i)).replace(day=1)
-                month_end_date = (month_start_date.replace(month=month_start_date.month % 12 + 1, day=1) - timedelta(days=1))
-
-                month_start_timestamp = int(datetime.combine(month_start_date, datetime.min.time()).timestamp())
-                month_end_timestamp = int(datetime.combine(month_end_date, datetime.max.time()).timestamp())
-
-                cursor.execute("""
-                    SELECT COUNT(DISTINCT exercise_name), SUM(duration)
-                    FROM completed_exercises
-                    WHERE user_id = ? AND date_completed BETWEEN ? AND ?
-                """, (self.user_id, month_start_timestamp, month_end_timestamp))
+        # The heatmap can be coloured by exercises or by minutes per day
+        self.heatmap_metric = tk.StringVar(value="count")
+        heatmap_controls = tk.Frame(self.main_frame, bg="white")
+        heatmap_controls.pack(pady=(20, 0), fill="x")
+        tk.Label(heatmap_controls, text="Yearly heatmap by:", font=("Arial", 11), bg="white").pack(side="left")
+        for value, text in (("count", "Exercises"), ("duration", "Minutes")):
+            tk.Radiobutton(heatmap_controls, text=text, variable=self.heatmap_metric, value=value,
+                           font=("Arial", 11), bg="white", command=self.redraw_heatmap).pack(side="left", padx=5)
+
+        self.heatmap_frame = tk.Frame(self.main_frame, bg="white", bd=1, relief="solid")
+        self.heatmap_frame.pack(pady=(5, 20), fill="both", expand=True)
+
+        for frame in (self.monthly_graph_frame, self.weekly_graph_frame, self.heatmap_frame):
+            tk.Label(frame, text="Loading...", font=("Arial", 12), bg="white", fg="gray").pack(pady=20)
+
+        # One label for load errors, packed only while the last load failed
+        self.error_label = tk.Label(self.main_frame, text="", fg="red", bg="white")
+
+    def fetch_progress_data(self):
+        # Runs on a loader thread: only SQL here, charts are drawn in show_progress_data
+        cursor = get_connection().cursor()
+        today = datetime.now().date()
+
+        # 52 Monday-first week columns ending with the current week
+        year_first_day = today - timedelta(days=today.weekday() + 51 * 7)
+
+        return {
+            # Last six calendar months, one daily_activity read
+            "monthly_buckets": bucket_activity(cursor, self.user_id, add_months(today.replace(day=1), -5), today, "month"),
+            "streaks": get_streaks(cursor, self.user_id, today),
+            "weekly_buckets": bucket_activity(cursor, self.user_id, today - timedelta(days=6), today, "day"),
+            "year_first_day": year_first_day,
+            "year_buckets": bucket_activity(cursor, self.user_id, year_first_day, today, "day"),
+        }
+
+    def show_progress_data(self, data):
+        self.error_label.pack_forget()
+        if data == self.shown_data:
+            return  # same numbers: keep the charts already drawn
+        self.shown_data = data
+        self.load_monthly_progress(data)
+        self.load_weekly_progress(data)  # <-- add weekly chart
+        self.load_yearly_heatmap(data)
+
+    def show_load_error(self, error):
+        for frame in (self.monthly_graph_frame, self.weekly_graph_frame, self.heatmap_frame):
+            for widget in frame.winfo_children():
+                widget.destroy()
+        self.shown_data = None  # the charts are gone, so the next good load redraws them
+        self.show_error(f"Error: {error}")
 
-                result = cursor.fetchone()
-                total_exercises_month = result[0] if result and result[0] else 0
-                total_duration_month = result[1] if result and result[1] else 0
+    def show_error(self, text):
+        self.error_label.config(text=text)
+        self.error_label.pack(pady=20)
 
-                month_name = month_start_date.strftime('%b %y')
-                monthly_data[month_name] = {
-                    'count': total_exercises_month,
-                    'duration': total_duration_month
-                }
+    def load_monthly_progress(self, data):
+        try:
+            monthly_buckets = data["monthly_buckets"]
 
-            months_sorted = sorted(monthly_data.keys(), key=lambda x: datetime.strptime(x, '%b %y'))
-            monthly_counts = [monthly_data[m]['count'] for m in months_sorted]
+            months_sorted = [start.strftime('%b %y') for start, *_ in monthly_buckets]
+            monthly_counts = [count for _, count, _, _ in monthly_buckets]
 
             # Update labels
-            current_month_start_date = today.replace(day=1)
-            current_month_start_timestamp = int(datetime.combine(current_month_start_date, datetime.min.time()).timestamp())
-            current_month_end_timestamp = int(datetime.combine(today, datetime.max.time()).timestamp())
-
-            cursor.execute("""
-                SELECT COUNT(DISTINCT exercise_name), SUM(duration)
-                FROM completed_exercises
-                WHERE user_id = ? AND date_completed BETWEEN ? AND ?
-            """, (self.user_id, current_month_start_timestamp, current_month_end_timestamp))
-            current_month_result = cursor.fetchone()
-            current_month_total_workouts = current_month_result[0] if current_month_result and current_month_result[0] else 0
-            current_month_total_duration = current_month_result[1] if current_month_result and current_month_result[1] else 0
+            _, current_month_total_workouts, current_month_total_duration, _ = monthly_buckets[-1]
 
             current_month_avg_duration_min = round(current_month_total_duration / current_month_total_workouts / 60, 1) if current_month_total_workouts > 0 else 0
 
             # streak
-            current_streak = 0
-            for i in range(365):
-                check_date = today - timedelta(days=i)
-                start_ts = int(datetime.combine(check_date, datetime.min.time()).timestamp())
-                end_ts = int(datetime.combine(check_date, datetime.max.time()).timestamp())
-
-                cursor.execute("""
-                    SELECT COUNT(DISTINCT exercise_name) FROM completed_exercises
-                    WHERE user_id = ? AND date_completed BETWEEN ? AND ?
-                """, (self.user_id, start_ts, end_ts))
-                day_count = cursor.fetchone()[0]
-
-                if day_count > 0:
-                    current_streak += 1
-                else:
-                    if i == 0 or current_streak > 0:
-                        break
+            current_streak, longest_streak = data["streaks"]
 
             self.total_workouts_label.config(text=f"Total Workouts This Month: {current_month_total_workouts}")
             self.avg_duration_label.config(text=f"Avg. Duration This Month: {current_month_avg_duration_min} min")
-            self.streak_label.config(text=f"Current Streak: {current_streak} days")
+            self.streak_label.config(text=f"Current Streak: {current_streak} days (Longest: {longest_streak} days)")
 
             # Clear old graph
             for widget in self.monthly_graph_frame.winfo_children():
@@ -155,36 +159,14 @@ class ProgressPage(tk.Frame):
                          font=("Arial", 12), bg="white", fg="gray").pack(pady=20)
 
         except Exception as e:
-            tk.Label(self.main_frame, text=f"Error: {e}", fg="red", bg="white").pack(pady=20)
-        finally:
-            if conn:
-                conn.close()
+            self.show_error(f"Error: {e}")
 
-    def load_weekly_progress(self):
+    def load_weekly_progress(self, data):
         """Weekly chart moved here from HomePage"""
-        if not self.user_id:
-            return
-
-        conn = None
         try:
-            conn = sqlite3.connect("fitness_app.db")
-            cursor = conn.cursor()
-            today = datetime.now().date()
-
-            dates_for_week = [(today - timedelta(days=i)).strftime("%b %d") for i in range(6, -1, -1)]
-            weekly_completed_data = {}
-            for i in range(7):
-                current_date = today - timedelta(days=i)
-                day_start = int(datetime.combine(current_date, datetime.min.time()).timestamp())
-                day_end = int(datetime.combine(current_date, datetime.max.time()).timestamp())
-
-                cursor.execute("""
-                    SELECT COUNT(DISTINCT exercise_name) FROM completed_exercises
-                    WHERE user_id = ? AND date_completed BETWEEN ? AND ?
-                """, (self.user_id, day_start, day_end))
-                weekly_completed_data[current_date] = cursor.fetchone()[0]
-
-            graph_data_for_week = [weekly_completed_data.get((today - timedelta(days=i)), 0) for i in range(6, -1, -1)]
+            daily_buckets = data["weekly_buckets"]
+            dates_for_week = [day.strftime("%b %d") for day, *_ in daily_buckets]
+            graph_data_for_week = [count for _, count, _, _ in daily_buckets]
 
             for widget in self.weekly_graph_frame.winfo_children():
                 widget.destroy()
@@ -212,9 +194,68 @@ class ProgressPage(tk.Frame):
         except Exception as e:
             tk.Label(self.weekly_graph_frame, text=f"No weekly workout data available: {e}",
                      font=("Arial", 12), bg="white", fg="gray").pack(pady=20)
-        finally:
-            if conn:
-                conn.close()
 
+    def redraw_heatmap(self):
+        if self.shown_data is not None:
+            self.load_yearly_heatmap(self.shown_data)
 
+    def load_yearly_heatmap(self, data):
+        """52-week calendar heatmap; every cell comes from one daily_activity read."""
+        try:
+            first_day = data["year_first_day"]
+            daily_buckets = data["year_buckets"]
+            by_duration = self.heatmap_metric.get() == "duration"
+
+            # Exercises and minutes per day, by (weekday, week column)
+            counts = [[0] * 52 for _ in range(7)]
+            minutes = [[0] * 52 for _ in range(7)]
+            cell_days = {}
+            for day, count, duration, _ in daily_buckets:
+                row, col = day.weekday(), (day - first_day).days // 7
+                counts[row][col] = count
+                minutes[row][col] = round(duration / 60, 1)
+                cell_days[(row, col)] = day
+
+            active_days = sum(1 for _, count, _, sessions in daily_buckets if sessions)
+            total_minutes = round(sum(duration for _, _, duration, _ in daily_buckets) / 60)
+
+            for widget in self.heatmap_frame.winfo_children():
+                widget.destroy()
+
+            fig = plt.Figure(figsize=(7, 2.2), dpi=100)
+            ax = fig.add_subplot(111)
+            ax.imshow(minutes if by_duration else counts, cmap="Greens", aspect="auto", vmin=0)
+            ax.set_title(f"Your Year: {active_days} active days, {total_minutes} min", fontsize=12)
+            ax.set_yticks(range(7))
+            ax.set_yticklabels(["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"], fontsize=7)
+
+            month_ticks = [
+                ((day - first_day).days // 7, day.strftime("%b"))
+                for day, *_ in daily_buckets if day.day == 1
+            ]
+            ax.set_xticks([col for col, _ in month_ticks])
+            ax.set_xticklabels([label for _, label in month_ticks], fontsize=7)
+
+            chart = FigureCanvasTkAgg(fig, master=self.heatmap_frame)
+            chart.draw()
+            chart.get_tk_widget().pack(fill="both", expand=True)
 
+            # Both numbers for the day under the cursor, whichever one colours the cells
+            readout = tk.Label(self.heatmap_frame, text="Hover over a day to see its exercises and minutes.",
+                               font=("Arial", 10), bg="white", fg="gray")
+            readout.pack(pady=(0, 5))
+
+            def show_day(event):
+                if event.inaxes is not ax or event.xdata is None or event.ydata is None:
+                    return
+                row, col = int(round(event.ydata)), int(round(event.xdata))
+                day = cell_days.get((row, col))
+                if day is not None:
+                    readout.config(text=f"{day.strftime('%a %d %b %Y')}: {counts[row][col]} exercises, "
+                                        f"{minutes[row][col]:g} min")
+
+            chart.mpl_connect("motion_notify_event", show_day)
+
+        except Exception as e:
+            tk.Label(self.heatmap_frame, text=f"No yearly workout data available: {e}",
+                     font=("Arial", 12), bg="white", fg="gray").pack(pady=20)
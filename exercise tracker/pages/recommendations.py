@@ -1,12 +1,15 @@
 import tkinter as tk
 from tkinter import ttk
-import sqlite3
-from utils.recommender import get_recommendations
+from utils.db import get_connection
+from utils.catalog import get_catalog
 
 class RecommendationsPage(tk.Frame):
     def __init__(self, parent, controller):
         super().__init__(parent, bg="white")
         self.controller = controller
+        self.placeholder = None
+        self.lines = []
+        self.shown_recs = None
         self.pack(expand=True, fill="both")
         self.create_widgets()
 
@@ -21,56 +24,87 @@ class RecommendationsPage(tk.Frame):
             foreground="#4CAF50"
         ).pack(pady=(10, 20))
 
-        recs = []
+        self.main_frame = main_frame
+        if self.controller.logged_in_user_id:
+            self.placeholder = ttk.Label(main_frame, text="Loading recommendations...", font=("Arial", 16), foreground="gray")
+            self.placeholder.pack(pady=(2, 2), anchor="w")
+            self.refresh()
+        else:
+            self.show_lines(["Login to get personalized recommendations!"])
+
+    def refresh(self):
+        # Usually a cache hit; only a saved workout makes this recompute
         user_id = self.controller.logged_in_user_id
         if user_id:
-            try:
-                conn = sqlite3.connect("fitness_app.db")
-                cursor = conn.cursor()
+            self.controller.loader.load(
+                self, lambda: self.fetch_recommendations(user_id), self.show_recommendations,
+                on_error=self.show_load_error,
+            )
 
-                # --- calculate progress ---
-                def get_progress(ex_type):
-                    cursor.execute(f"SELECT COUNT(DISTINCT exercise_name) FROM exercises WHERE LOWER(exercise_type) = ?", (ex_type,))
-                    total = cursor.fetchone()[0]
-                    cursor.execute("""SELECT COUNT(DISTINCT ce.exercise_name)
-                                      FROM completed_exercises ce
-                                      JOIN exercises e ON ce.exercise_name = e.exercise_name
-                                      WHERE ce.user_id = ? AND LOWER(e.exercise_type) = ?""", (user_id, ex_type))
-                    completed = cursor.fetchone()[0]
-                    return round((completed / total) * 100, 1) if total > 0 else 0.0
+    def fetch_recommendations(self, user_id):
+        # Runs on a loader thread: no widget access here (and NumPy loads here, not on the Tk thread)
+        from utils.recommender import get_recommendations, cached_recommendations
 
-                simple_progress = get_progress("simple")
-                medium_progress = get_progress("medium")
-                complex_progress = get_progress("complex")
+        recs = cached_recommendations(user_id, db_path="fitness_app.db", num_recommendations=5)
+        if recs is not None:
+            return recs  # progress is only an input to a fresh computation
 
-                conn.close()
+        cursor = get_connection().cursor()
+        catalog = get_catalog()
 
-                # --- get recommendations ---
-                recs = get_recommendations(
-                    user_id,
-                    db_path="fitness_app.db",
-                    num_recommendations=5,
-                    simple_progress=simple_progress,
-                    medium_progress=medium_progress,
-                    complex_progress=complex_progress
-                )
+        # --- calculate progress ---
+        def get_progress(ex_type):
+            total = catalog.count_names(ex_type)
+            cursor.execute("""SELECT COUNT(DISTINCT ce.exercise_name)
+                              FROM completed_exercises ce
+                              JOIN exercises e ON e.id = ce.exercise_id
+                              WHERE ce.user_id = ? AND e.exercise_type = ? COLLATE NOCASE""", (user_id, ex_type))
+            completed = cursor.fetchone()[0]
+            return round((completed / total) * 100, 1) if total > 0 else 0.0
 
-                # --- format output safely ---
-                recommendation_list = []
-                for rec in recs:
-                    if isinstance(rec, tuple):
-                        name, etype = rec
-                        if etype:  # only show if not empty
-                            recommendation_list.append(f"• {name} ({etype.capitalize()})")
-                        else:
-                            recommendation_list.append(f"• {name}")
-                    else:
-                        recommendation_list.append(f"• {rec}")
+        simple_progress = get_progress("simple")
+        medium_progress = get_progress("medium")
+        complex_progress = get_progress("complex")
 
-            except Exception as e:
-                recommendation_list = [f"Error loading recommendations: {e}"]
-        else:
-            recommendation_list = ["Login to get personalized recommendations!"]
+        # --- get recommendations ---
+        return get_recommendations(
+            user_id,
+            db_path="fitness_app.db",
+            num_recommendations=5,
+            simple_progress=simple_progress,
+            medium_progress=medium_progress,
+            complex_progress=complex_progress
+        )
+
+    def show_recommendations(self, recs):
+        if recs == self.shown_recs:
+            return
+        self.shown_recs = recs
+
+        # --- format output safely ---
+        recommendation_list = []
+        for rec in recs:
+            if isinstance(rec, tuple):
+                name, etype = rec
+                if etype:  # only show if not empty
+                    recommendation_list.append(f"• {name} ({etype.capitalize()})")
+                else:
+                    recommendation_list.append(f"• {name}")
+            else:
+                recommendation_list.append(f"• {rec}")
+        self.show_lines(recommendation_list)
+
+    def show_load_error(self, error):
+        self.show_lines([f"Error loading recommendations: {error}"])
 
-        for rec_text in recommendation_list:
-            ttk.Label(main_frame, text=rec_text, font=("Arial", 16), wraplength=700, justify="left").pack(pady=(2, 2), anchor="w")
+    def show_lines(self, lines):
+        if self.placeholder is not None:
+            self.placeholder.destroy()
+            self.placeholder = None
+        for label in self.lines:
+            label.destroy()
+        self.lines = []
+        for rec_text in lines:
+            label = ttk.Label(self.main_frame, text=rec_text, font=("Arial", 16), wraplength=700, justify="left")
+            label.pack(pady=(2, 2), anchor="w")
+            self.lines.append(label)
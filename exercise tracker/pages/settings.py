@@ -1,6 +1,7 @@
 import tkinter as tk
 import sqlite3
 from tkinter import messagebox, ttk 
+from utils.db import run_in_transaction
 
 class SettingsPage(tk.Frame):
     def __init__(self, parent, controller):
@@ -148,19 +149,13 @@ class SettingsPage(tk.Frame):
             
             # Hash and save to DB
             hashed_password = self.hash_password(new_pass)
-            conn = None
             try:
-                conn = sqlite3.connect("fitness_app.db")
-                cursor = conn.cursor()
-                cursor.execute("UPDATE user_profile SET password = ? WHERE id = ?", (hashed_password, self.user_id))
-                conn.commit()
+                run_in_transaction(lambda conn: conn.execute(
+                    "UPDATE user_profile SET password = ? WHERE id = ?", (hashed_password, self.user_id)))
                 messagebox.showinfo("Success", "Password changed successfully!", parent=dialog)
                 dialog.destroy()
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to change password: {e}", parent=dialog)
-            finally:
-                if conn:
-                    conn.close()
 
         tk.Button(dialog, text="Save", command=save_new_password, bg="#4CAF50", fg="white").pack(pady=10)
         dialog.protocol("WM_DELETE_WINDOW", dialog.destroy) # Handle window close button
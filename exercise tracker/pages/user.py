@@ -1,6 +1,7 @@
 import tkinter as tk
 import sqlite3
 from tkinter import messagebox
+from utils.db import run_in_transaction
 
 class UserPage(tk.Frame):
     def __init__(self, parent, controller):
@@ -12,6 +13,12 @@ class UserPage(tk.Frame):
         self.create_widgets()
         self.load_user_profile()
 
+    def refresh(self):
+        # Never overwrite a form the user is halfway through editing
+        if self.edit_button.cget("text") == "Edit Profile":
+            self.status_label.config(text="")
+            self.load_user_profile()
+
     def create_widgets(self):
         for widget in self.winfo_children():
             widget.destroy()
@@ -57,37 +64,26 @@ class UserPage(tk.Frame):
 
 
     def load_user_profile(self):
-        if not self.user_id:
+        session = self.controller.session
+        if not session:
             messagebox.showerror("Error", "No user logged in.")
             return
 
-        conn = None
-        try:
-            conn = sqlite3.connect("fitness_app.db")
-            cursor = conn.cursor()
-            # Removed fitness_goal from SELECT query
-            cursor.execute("SELECT name, age, gender, phone_number FROM user_profile WHERE id = ?", (self.user_id,))
-            user_data = cursor.fetchone()
-
-            if user_data:
-                self.user_data = {
-                    "Name": user_data[0],
-                    "Age": user_data[1],
-                    "Gender": user_data[2],
-                    "Phone Number": user_data[3],
-                    # "Fitness Goal": user_data[4] # Removed
-                }
-                self.display_user_data()
-            else:
-                messagebox.showerror("Error", "User profile not found in database.")
-
-        except sqlite3.OperationalError as e:
-            messagebox.showerror("Database Error", f"Failed to load profile: {e}")
-        except Exception as e:
-            messagebox.showerror("Error", f"An unexpected error occurred: {e}")
-        finally:
-            if conn:
-                conn.close()
+        # The session holds what login read plus every save since, so no query is needed
+        self.show_user_profile((session.name, session.age, session.gender, session.phone_number))
+
+    def show_user_profile(self, user_data):
+        if user_data:
+            self.user_data = {
+                "Name": user_data[0],
+                "Age": user_data[1],
+                "Gender": user_data[2],
+                "Phone Number": user_data[3],
+                # "Fitness Goal": user_data[4] # Removed
+            }
+            self.display_user_data()
+        else:
+            messagebox.showerror("Error", "User profile not found in database.")
 
     def display_user_data(self):
         for key, entry_widget in self.entries.items():
@@ -142,17 +138,14 @@ class UserPage(tk.Frame):
                 messagebox.showerror("Error", "Please enter a valid phone number.")
                 return
 
-            conn = None
             try:
-                conn = sqlite3.connect("fitness_app.db")
-                cursor = conn.cursor()
                 # Removed fitness_goal from UPDATE query
-                cursor.execute("""
+                run_in_transaction(lambda conn: conn.execute("""
                     UPDATE user_profile
                     SET name = ?, age = ?, gender = ?
                     WHERE id = ?
-                """, (new_name, new_age, new_gender, self.user_id))
-                conn.commit()
+                """, (new_name, new_age, new_gender, self.user_id)))
+                self.controller.session.update(name=new_name, age=new_age, gender=new_gender)
                 # Update local user_data dictionary
                 self.user_data = {
                     "Name": new_name,
@@ -166,9 +159,6 @@ class UserPage(tk.Frame):
                 messagebox.showerror("Database Error", f"Failed to update profile: {e}")
             except Exception as e:
                 messagebox.showerror("Error", f"An unexpected error occurred: {e}")
-            finally:
-                if conn:
-                    conn.close()
 
         except ValueError:
             messagebox.showerror("Error", "Age must be a number.")
@@ -1,11 +1,17 @@
 import tkinter as tk
 import sqlite3
 from datetime import date
+from utils.db import get_connection
+from pages.weekly_plan import generate_weekly_plan
 import tkinter.messagebox as messagebox
 
 class WorkoutPage(tk.Frame):
     def __init__(self, parent, controller):
         super().__init__(parent, bg="white")
+        self.controller = controller
+        self.message = None
+        self.plan_shown = False
+        self.shown_rows = None
 
         tk.Label(self, text="🗓️ Weekly Workout Plan", font=("Arial", 20, "bold"), bg="white").pack(pady=15)
 
@@ -16,50 +22,93 @@ class WorkoutPage(tk.Frame):
         for i, h in enumerate(headers):
             tk.Label(table, text=h, font=("Arial", 10, "bold"), bg="#d0f0ff", width=25).grid(row=0, column=i, padx=5, pady=10)
 
-        conn = None
-        try:
-            conn = sqlite3.connect("fitness_app.db")
-            cursor = conn.cursor()
-
-            cursor.execute("SELECT fitness_goal FROM user_profile ORDER BY id DESC LIMIT 1")
-            row = cursor.fetchone()
-
-            goal = None
-            if row and row[0]:
-                goal = str(row[0]).strip().lower()
-
-            if goal:
-                cursor.execute("""
-                    SELECT day, exercise_name, exercise_type, target_body_part, benefit
-                    FROM workout_plan
-                    WHERE LOWER(focus_area) = ?
-                    ORDER BY
-                        CASE day
-                            WHEN 'Monday' THEN 1
-                            WHEN 'Tuesday' THEN 2
-                            WHEN 'Wednesday' THEN 3
-                            WHEN 'Thursday' THEN 4
-                            WHEN 'Friday' THEN 5
-                            WHEN 'Saturday' THEN 6
-                            WHEN 'Sunday' THEN 7
-                        END
-                """, (goal,))
-
-                for row_idx, row_data in enumerate(cursor.fetchall(), start=1):
-                    bg = "#f9f9f9" if row_idx % 2 == 0 else "white"
-                    for col_idx, val in enumerate(row_data):
-                        tk.Label(table, text=val, wraplength=220, anchor="w", justify="left", bg=bg).grid(
-                            row=row_idx, column=col_idx, sticky="w", padx=5, pady=6
-                        )
-            else:
-                tk.Label(self, text="No fitness goal found. Please set your profile and goal in 'User Info'.",
-                         font=("Arial", 12), fg="red", bg="white").pack(pady=20)
-
-        except sqlite3.OperationalError as e:
-            messagebox.showerror("Database Error", f"Failed to load workout plan: {e}")
-        except Exception as e:
-            messagebox.showerror("Error", f"An unexpected error occurred: {e}")
-        finally:
-            if conn:
-                conn.close()
+        self.table = table
+        self.placeholder = tk.Label(self, text="Loading your plan...", font=("Arial", 12), fg="gray", bg="white")
+        self.placeholder.pack(pady=10)
 
+        self.refresh()
+
+    def refresh(self):
+        user_id = self.controller.logged_in_user_id
+        self.controller.loader.load(self, lambda: self.fetch_plan(user_id), self.show_plan,
+                                    on_error=self.show_load_error)
+
+    def fetch_plan(self, user_id):
+        # Runs on a loader thread: no widget access here
+        if user_id is None:
+            return None
+        cursor = get_connection().cursor()
+
+        # The plan follows the focus area this user trains most
+        cursor.execute("""
+            SELECT e.focus_area
+            FROM completed_exercises ce
+            JOIN exercises e ON e.id = ce.exercise_id
+            WHERE ce.user_id = ?
+            GROUP BY e.focus_area
+            ORDER BY COUNT(*) DESC, e.focus_area
+            LIMIT 1
+        """, (user_id,))
+        row = cursor.fetchone()
+        if not row or not row[0]:
+            return None
+
+        goal = row[0]
+        generate_weekly_plan(goal)  # no-op if this week's plan already exists
+
+        cursor.execute("""
+            SELECT day, exercise_name, exercise_type, target_body_part, benefit
+            FROM workout_plan
+            WHERE focus_area = ? COLLATE NOCASE
+            ORDER BY
+                CASE day
+                    WHEN 'Monday' THEN 1
+                    WHEN 'Tuesday' THEN 2
+                    WHEN 'Wednesday' THEN 3
+                    WHEN 'Thursday' THEN 4
+                    WHEN 'Friday' THEN 5
+                    WHEN 'Saturday' THEN 6
+                    WHEN 'Sunday' THEN 7
+                END
+        """, (goal,))
+        return cursor.fetchall()
+
+    def show_plan(self, rows):
+        if self.placeholder is not None:
+            self.placeholder.destroy()
+            self.placeholder = None
+
+        if self.plan_shown and rows == self.shown_rows:
+            return
+        self.plan_shown = True
+        self.shown_rows = rows
+
+        # Clear what the last load drew, keeping the header row
+        for widget in self.table.grid_slaves():
+            if int(widget.grid_info()["row"]) > 0:
+                widget.destroy()
+        if self.message is not None:
+            self.message.destroy()
+            self.message = None
+
+        if rows is None:
+            self.message = tk.Label(self, text="No workouts yet. Complete a few exercises and your plan will follow the focus area you train most.",
+                                    font=("Arial", 12), fg="red", bg="white")
+            self.message.pack(pady=20)
+            return
+
+        for row_idx, row_data in enumerate(rows, start=1):
+            bg = "#f9f9f9" if row_idx % 2 == 0 else "white"
+            for col_idx, val in enumerate(row_data):
+                tk.Label(self.table, text=val, wraplength=220, anchor="w", justify="left", bg=bg).grid(
+                    row=row_idx, column=col_idx, sticky="w", padx=5, pady=6
+                )
+
+    def show_load_error(self, error):
+        if self.placeholder is not None:
+            self.placeholder.destroy()
+            self.placeholder = None
+        if isinstance(error, sqlite3.OperationalError):
+            messagebox.showerror("Database Error", f"Failed to load workout plan: {error}")
+        else:
+            messagebox.showerror("Error", f"An unexpected error occurred: {error}")
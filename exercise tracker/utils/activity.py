@@ -0,0 +1,303 @@
+from datetime import date, datetime, timedelta
+from itertools import groupby
+
+from utils.cooccurrence import advance_cooccurrence
+
+
+# --- Local-day helpers ---
+# Days are bucketed in local time, the same way the progress charts label them.
+
+def local_day(timestamp):
+    return datetime.fromtimestamp(timestamp).date().isoformat()
+
+
+def day_bounds(day):
+    if isinstance(day, str):
+        day = date.fromisoformat(day)
+    start_ts = int(datetime.combine(day, datetime.min.time()).timestamp())
+    end_ts = int(datetime.combine(day, datetime.max.time()).timestamp())
+    return start_ts, end_ts
+
+
+# --- Write path ---
+
+def record_completion(conn, user_id, exercise_id, exercise_name, completed_at,
+                      start_time, end_time, duration, reps, energy_level, record_id=None):
+    """Insert one completion and fold it into daily_activity.
+
+    Must run inside the caller's transaction (see utils.db.run_in_transaction)
+    so the raw event and its rollup commit together.
+    """
+    cursor = conn.cursor()
+    day = local_day(completed_at)
+    day_start, day_end = day_bounds(day)
+
+    cursor.execute("""
+        SELECT 1 FROM completed_exercises
+        WHERE user_id = ? AND exercise_name = ? AND date_completed BETWEEN ? AND ?
+        LIMIT 1
+    """, (user_id, exercise_name, day_start, day_end))
+    new_exercise_today = cursor.fetchone() is None
+
+    cursor.execute("""INSERT INTO completed_exercises
+        (user_id, exercise_id, exercise_name, date_completed, start_time, end_time, duration, reps_completed, energy_level, client_record_id)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+        (user_id, exercise_id, exercise_name, completed_at, start_time, end_time, duration, reps, energy_level, record_id))
+    completion_id = cursor.lastrowid
+
+    cursor.execute("""
+        INSERT INTO daily_activity (user_id, local_day, distinct_exercises, total_duration, sessions)
+        VALUES (?, ?, ?, ?, 1)
+        ON CONFLICT (user_id, local_day) DO UPDATE SET
+            distinct_exercises = distinct_exercises + excluded.distinct_exercises,
+            total_duration = total_duration + excluded.total_duration,
+            sessions = sessions + 1
+    """, (user_id, day, 1 if new_exercise_today else 0, duration or 0))
+
+    advance_streak(cursor, user_id, day)
+    advance_profile(cursor, user_id, exercise_id, energy_level)
+    advance_cooccurrence(cursor, user_id, exercise_name, completed_at)
+
+    return completion_id
+
+
+def advance_streak(cursor, user_id, day):
+    """O(1) streak update for activity on `day` (an ISO date string)."""
+    cursor.execute(
+        "SELECT current_streak, longest_streak, last_active_day FROM user_streaks WHERE user_id = ?",
+        (user_id,),
+    )
+    row = cursor.fetchone()
+
+    if row is None:
+        current_streak, longest_streak = 1, 1
+    else:
+        current_streak, longest_streak, last_active_day = row
+        if last_active_day == day:
+            return
+        if last_active_day and last_active_day > day:
+            # Back-dated save: the streak history changed, recount this user
+            recompute_streaks(cursor, user_id)
+            return
+        yesterday = (date.fromisoformat(day) - timedelta(days=1)).isoformat()
+        current_streak = current_streak + 1 if last_active_day == yesterday else 1
+        longest_streak = max(longest_streak, current_streak)
+
+    cursor.execute("""
+        INSERT INTO user_streaks (user_id, current_streak, longest_streak, last_active_day)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT (user_id) DO UPDATE SET
+            current_streak = excluded.current_streak,
+            longest_streak = excluded.longest_streak,
+            last_active_day = excluded.last_active_day
+    """, (user_id, current_streak, longest_streak, day))
+
+
+def rebuild_daily_activity(cursor, user_id=None):
+    """Regenerate daily_activity from completed_exercises (all users or one)."""
+    user_filter = "" if user_id is None else "WHERE user_id = ?"
+    params = () if user_id is None else (user_id,)
+
+    cursor.execute(f"DELETE FROM daily_activity {user_filter}", params)
+    cursor.execute(f"""
+        INSERT INTO daily_activity (user_id, local_day, distinct_exercises, total_duration, sessions)
+        SELECT user_id,
+               date(date_completed, 'unixepoch', 'localtime'),
+               COUNT(DISTINCT exercise_name),
+               COALESCE(SUM(duration), 0),
+               COUNT(*)
+        FROM completed_exercises
+        {user_filter}
+        GROUP BY user_id, date(date_completed, 'unixepoch', 'localtime')
+    """, params)
+
+
+def recompute_streaks(cursor, user_id=None):
+    """Recovery path: recount streaks in one ordered pass over daily_activity."""
+    user_filter = "" if user_id is None else "WHERE user_id = ?"
+    params = () if user_id is None else (user_id,)
+
+    cursor.execute(f"""
+        SELECT user_id, local_day FROM daily_activity
+        {user_filter}
+        ORDER BY user_id, local_day
+    """, params)
+
+    streaks = {}
+    for uid, day in cursor.fetchall():
+        day = date.fromisoformat(day)
+        if uid not in streaks:
+            streaks[uid] = [1, 1, day]
+            continue
+        entry = streaks[uid]
+        entry[0] = entry[0] + 1 if day - entry[2] == timedelta(days=1) else 1
+        entry[1] = max(entry[1], entry[0])
+        entry[2] = day
+
+    cursor.execute(f"DELETE FROM user_streaks {user_filter}", params)
+    cursor.executemany(
+        "INSERT INTO user_streaks (user_id, current_streak, longest_streak, last_active_day) VALUES (?, ?, ?, ?)",
+        [(uid, current, longest, last.isoformat()) for uid, (current, longest, last) in streaks.items()],
+    )
+
+
+# --- Feature profiles ---
+# A user's profile is the energy-weighted count of every feature (focus area,
+# type, body part) across their completions. An exercise name that appears in
+# several focus areas always contributes the features of its first catalog row.
+
+ENERGY_WEIGHTS = {"high": 1.5, "medium": 1.0}
+DEFAULT_ENERGY_WEIGHT = 0.5  # low, or anything unrecognised
+
+FIRST_ROW_FEATURES_SQL = """
+    SELECT focus_area, exercise_type, target_body_part FROM exercises
+    WHERE exercise_name = (SELECT exercise_name FROM exercises WHERE id = ?)
+    ORDER BY id LIMIT 1
+"""
+
+
+def energy_weight(energy_level):
+    return ENERGY_WEIGHTS.get(str(energy_level).lower(), DEFAULT_ENERGY_WEIGHT)
+
+
+def profile_features(*values):
+    """The distinct, stripped, non-empty feature values of one exercise."""
+    features = [str(v).strip() for v in values if v is not None and str(v).strip()]
+    return list(dict.fromkeys(features))
+
+
+def advance_profile(cursor, user_id, exercise_id, energy_level):
+    """O(features) profile update for one completion."""
+    if exercise_id is None:
+        return
+    cursor.execute(FIRST_ROW_FEATURES_SQL, (exercise_id,))
+    row = cursor.fetchone()
+    if row is None:
+        return
+    weight = energy_weight(energy_level)
+    cursor.executemany("""
+        INSERT INTO user_feature_profile (user_id, feature, weight) VALUES (?, ?, ?)
+        ON CONFLICT (user_id, feature) DO UPDATE SET weight = weight + excluded.weight
+    """, [(user_id, feature, weight) for feature in profile_features(*row)])
+
+
+def rebuild_user_profiles(cursor, user_id=None):
+    """Regenerate user_feature_profile from completed_exercises, e.g. after a catalog change.
+
+    Each profile is features.user_profile over the user's history, against a
+    feature store built from the exercises table as this cursor sees it (the
+    cached catalog may not include this transaction's changes yet).
+    """
+    # numpy is only needed here, not on the per-save path above
+    from utils.catalog import Exercise, ExerciseCatalog
+    from utils.features import build_feature_store, user_profile
+
+    user_filter = "" if user_id is None else "WHERE ce.user_id = ?"
+    params = () if user_id is None else (user_id,)
+
+    cursor.execute("""
+        SELECT id, focus_area, exercise_type, target_body_part,
+               exercise_name, exercise_steps, min_count_duration, benefit
+        FROM exercises ORDER BY id
+    """)
+    store = build_feature_store(ExerciseCatalog((Exercise(*row) for row in cursor.fetchall()), version=0))
+
+    cursor.execute(f"""
+        SELECT ce.user_id, e.exercise_name, ce.energy_level
+        FROM completed_exercises ce
+        JOIN exercises e ON e.id = ce.exercise_id
+        {user_filter}
+        ORDER BY ce.user_id
+    """, params)
+
+    rows = []
+    for uid, history in groupby(cursor.fetchall(), key=lambda row: row[0]):
+        history = list(history)
+        profile = user_profile(store, [name for _, name, _ in history], [level for _, _, level in history])
+        rows.extend((uid, store.classes[i], float(profile[i])) for i in profile.nonzero()[0])
+
+    cursor.execute(f"DELETE FROM user_feature_profile {user_filter.replace('ce.', '')}", params)
+    cursor.executemany("INSERT INTO user_feature_profile (user_id, feature, weight) VALUES (?, ?, ?)", rows)
+
+
+def get_user_profile(cursor, user_id):
+    """{feature: weight} for one user."""
+    cursor.execute("SELECT feature, weight FROM user_feature_profile WHERE user_id = ?", (user_id,))
+    return dict(cursor.fetchall())
+
+
+# --- Read path ---
+
+def get_streaks(cursor, user_id, today=None):
+    """(current, longest) streak in days. The current streak only counts if it reaches today."""
+    today = today or date.today()
+    cursor.execute(
+        "SELECT current_streak, longest_streak, last_active_day FROM user_streaks WHERE user_id = ?",
+        (user_id,),
+    )
+    row = cursor.fetchone()
+    if row is None:
+        return 0, 0
+    current_streak, longest_streak, last_active_day = row
+    if last_active_day != today.isoformat():
+        current_streak = 0
+    return current_streak, longest_streak
+
+
+def get_daily_activity(cursor, user_id, first_day, last_day):
+    """{date: (distinct_exercises, total_duration, sessions)} for days with activity."""
+    cursor.execute("""
+        SELECT local_day, distinct_exercises, total_duration, sessions
+        FROM daily_activity
+        WHERE user_id = ? AND local_day BETWEEN ? AND ?
+    """, (user_id, first_day.isoformat(), last_day.isoformat()))
+    return {
+        date.fromisoformat(day): (distinct_exercises, total_duration, sessions)
+        for day, distinct_exercises, total_duration, sessions in cursor.fetchall()
+    }
+
+
+# --- Bucketing ---
+# Any chart is a zero-filled run of buckets built from a single daily_activity
+# read. Weeks are ISO weeks (starting Monday); months are calendar months.
+
+GRANULARITIES = ("day", "week", "month")
+
+
+def add_months(day, months):
+    month_index = day.year * 12 + day.month - 1 + months
+    return day.replace(year=month_index // 12, month=month_index % 12 + 1, day=1)
+
+
+def bucket_start(day, granularity):
+    if granularity == "day":
+        return day
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    raise ValueError(f"Unknown granularity: {granularity}")
+
+
+def next_bucket(start, granularity):
+    if granularity == "day":
+        return start + timedelta(days=1)
+    if granularity == "week":
+        return start + timedelta(days=7)
+    return add_months(start, 1)
+
+
+def bucket_activity(cursor, user_id, first_day, last_day, granularity="day"):
+    """[(bucket_start, distinct_exercises, total_duration, sessions), ...] covering first_day..last_day."""
+    buckets = {}
+    start = bucket_start(first_day, granularity)
+    while start <= last_day:
+        buckets[start] = [0, 0, 0]
+        start = next_bucket(start, granularity)
+
+    for day, values in get_daily_activity(cursor, user_id, first_day, last_day).items():
+        totals = buckets[bucket_start(day, granularity)]
+        for i, value in enumerate(values):
+            totals[i] += value
+
+    return [(start, *totals) for start, totals in buckets.items()]
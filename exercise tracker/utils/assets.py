@@ -0,0 +1,164 @@
+import json
+import os
+import struct
+import threading
+
+from PIL import Image
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ASSET_PATH = os.path.join(APP_DIR, "images", "thumbnails.assets")
+ASSET_FORMAT = 1  # bump when the file layout or thumbnail() changes
+
+# Directory (relative to the app) -> the size every PNG directly inside it is shown at
+THUMBNAIL_SPECS = {
+    "images": (200, 140),
+    "images/body_parts": (80, 80),
+}
+
+_MAGIC = b"UYLTHUMB"
+_HEADER = struct.Struct("<8sI")  # magic, length of the JSON index that follows
+
+
+def thumbnail(image, size):
+    """The display-sized RGBA copy of a decoded image; the same for the store and a direct decode."""
+    return image.convert("RGBA").resize(tuple(size))
+
+
+def asset_name(path):
+    """An image's path relative to the app directory, with forward slashes."""
+    return os.path.relpath(os.path.abspath(path), APP_DIR).replace(os.sep, "/")
+
+
+def scan_sources(specs=THUMBNAIL_SPECS):
+    """{asset name: mtime_ns} for every source image the store should hold."""
+    sources = {}
+    for directory in specs:
+        full = os.path.join(APP_DIR, directory)
+        if not os.path.isdir(full):
+            continue
+        for filename in sorted(os.listdir(full)):
+            if filename.lower().endswith(".png"):
+                path = os.path.join(full, filename)
+                sources[asset_name(path)] = os.stat(path).st_mtime_ns
+    return sources
+
+
+# --- Building ---
+# File layout: header, JSON index, then the raw RGBA pixels of every
+# thumbnail back to back. The index maps "name@WxH" to [offset, length,
+# width, height] within the pixel data and records each source's mtime.
+
+def build_asset_store(path=ASSET_PATH, specs=THUMBNAIL_SPECS):
+    sources = scan_sources(specs)
+    entries = {}
+    blobs = []
+    offset = 0
+    for name in sources:
+        size = tuple(specs[os.path.dirname(name)])
+        with Image.open(os.path.join(APP_DIR, name)) as image:
+            pixels = thumbnail(image, size).tobytes()
+        entries[f"{name}@{size[0]}x{size[1]}"] = [offset, len(pixels), size[0], size[1]]
+        blobs.append(pixels)
+        offset += len(pixels)
+
+    index = {
+        "format": ASSET_FORMAT,
+        "specs": {directory: list(size) for directory, size in specs.items()},
+        "sources": sources,
+        "entries": entries,
+    }
+    index_bytes = json.dumps(index, sort_keys=True).encode("utf-8")
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, len(index_bytes)))
+        f.write(index_bytes)
+        for pixels in blobs:
+            f.write(pixels)
+    os.replace(tmp_path, path)
+    return index
+
+
+def read_index(path=ASSET_PATH):
+    """(index, offset of the pixel data) for a store file, or (None, 0) if it is missing or unreadable."""
+    try:
+        with open(path, "rb") as f:
+            magic, index_length = _HEADER.unpack(f.read(_HEADER.size))
+            if magic != _MAGIC:
+                return None, 0
+            index = json.loads(f.read(index_length).decode("utf-8"))
+    except (OSError, ValueError, struct.error) as e:
+        if not isinstance(e, FileNotFoundError):
+            print(f"Ignoring unreadable asset store {path}: {e}")
+        return None, 0
+    if index.get("format") != ASSET_FORMAT:
+        return None, 0
+    return index, _HEADER.size + index_length
+
+
+# --- Reading ---
+
+class AssetStore:
+    """Pre-sized thumbnails read straight from the store file, no PNG decoding.
+
+    load() hands back None for anything the store does not hold at the
+    current mtime, so callers fall back to decoding the source; ensure()
+    rebuilds the file when the sources have changed (done once per launch).
+    """
+
+    def __init__(self, path=ASSET_PATH, specs=THUMBNAIL_SPECS):
+        self.path = path
+        self.specs = specs
+        self._index = None
+        self._data_offset = 0
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def _ensure_loaded(self):
+        if not self._loaded:
+            self._index, self._data_offset = read_index(self.path)
+            self._loaded = True
+
+    def is_current(self):
+        with self._lock:
+            self._ensure_loaded()
+            index = self._index
+        return (
+            index is not None
+            and index["specs"] == {directory: list(size) for directory, size in self.specs.items()}
+            and index["sources"] == scan_sources(self.specs)
+        )
+
+    def ensure(self):
+        """Rebuild the store if any source image was added, removed or changed. Returns True if it did."""
+        if self.is_current():
+            return False
+        with self._lock:
+            build_asset_store(self.path, self.specs)
+            self._loaded = False
+            self._ensure_loaded()
+        return True
+
+    def load(self, path, size, mtime_ns):
+        """The thumbnail of path at size as a PIL image, or None if the store has no current copy."""
+        name = asset_name(path)
+        with self._lock:
+            self._ensure_loaded()
+            if self._index is None or self._index["sources"].get(name) != mtime_ns:
+                return None
+            entry = self._index["entries"].get(f"{name}@{size[0]}x{size[1]}")
+            if entry is None:
+                return None
+            offset, length, width, height = entry
+            try:
+                with open(self.path, "rb") as f:
+                    f.seek(self._data_offset + offset)
+                    pixels = f.read(length)
+            except OSError:
+                return None
+        if len(pixels) != length:
+            return None
+        return Image.frombytes("RGBA", (width, height), pixels)
+
+
+asset_store = AssetStore()
@@ -0,0 +1,104 @@
+import threading
+from collections import namedtuple
+
+from utils.db import DB_PATH, get_connection
+
+Exercise = namedtuple("Exercise", [
+    "id", "focus_area", "exercise_type", "target_body_part",
+    "exercise_name", "exercise_steps", "min_count_duration", "benefit",
+])
+
+
+def _key(value):
+    return str(value).strip().lower() if value is not None else ""
+
+
+class ExerciseCatalog:
+    """Immutable in-memory copy of the exercises table with facet lookups."""
+
+    def __init__(self, exercises, version):
+        self.version = version
+        self.exercises = list(exercises)
+        self.by_id = {e.id: e for e in self.exercises}
+
+        self.by_name = {}
+        self._by_focus_area = {}
+        self._by_type = {}
+        self._by_body_part = {}
+        for e in self.exercises:
+            self.by_name.setdefault(e.exercise_name, []).append(e)
+            self._by_focus_area.setdefault(_key(e.focus_area), []).append(e)
+            self._by_type.setdefault(_key(e.exercise_type), []).append(e)
+            self._by_body_part.setdefault(_key(e.target_body_part), []).append(e)
+
+    def __len__(self):
+        return len(self.exercises)
+
+    def filter(self, focus_area=None, exercise_type=None, target_body_part=None):
+        """Exercises matching every given facet (case-insensitive), in catalog order."""
+        facets = [
+            (self._by_focus_area, focus_area),
+            (self._by_type, exercise_type),
+            (self._by_body_part, target_body_part),
+        ]
+        candidates = None
+        for index, value in facets:
+            if value is None:
+                continue
+            matches = index.get(_key(value), [])
+            if candidates is None:
+                candidates = matches
+            else:
+                ids = {e.id for e in matches}
+                candidates = [e for e in candidates if e.id in ids]
+        return list(self.exercises if candidates is None else candidates)
+
+    def count_names(self, exercise_type=None):
+        """Number of distinct exercise names, optionally within one type."""
+        return len({e.exercise_name for e in self.filter(exercise_type=exercise_type)})
+
+    def first_by_name(self, exercise_name):
+        rows = self.by_name.get(exercise_name)
+        return rows[0] if rows else None
+
+
+# --- Process-wide cache ---
+
+_catalogs = {}
+_catalog_lock = threading.Lock()
+
+
+def get_catalog_version(db_path=DB_PATH):
+    row = get_connection(db_path).execute("SELECT version FROM catalog_version WHERE id = 1").fetchone()
+    return row[0] if row else 0
+
+
+def get_catalog(db_path=DB_PATH):
+    """The cached catalog for db_path, reloaded only when catalog_version moves."""
+    version = get_catalog_version(db_path)
+    catalog = _catalogs.get(db_path)
+    if catalog is not None and catalog.version == version:
+        return catalog
+
+    with _catalog_lock:
+        catalog = _catalogs.get(db_path)
+        if catalog is not None and catalog.version == version:
+            return catalog
+
+        cursor = get_connection(db_path).cursor()
+        cursor.execute("""
+            SELECT id, focus_area, exercise_type, target_body_part,
+                   exercise_name, exercise_steps, min_count_duration, benefit
+            FROM exercises ORDER BY id
+        """)
+        catalog = ExerciseCatalog((Exercise(*row) for row in cursor.fetchall()), version)
+        _catalogs[db_path] = catalog
+        return catalog
+
+
+def invalidate_catalog(db_path=None):
+    with _catalog_lock:
+        if db_path is None:
+            _catalogs.clear()
+        else:
+            _catalogs.pop(db_path, None)
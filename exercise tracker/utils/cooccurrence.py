@@ -0,0 +1,147 @@
+import math
+
+NEIGHBORS_PER_ITEM = 20
+SEED_ITEMS = 10  # most recently completed items a collaborative request starts from
+
+
+# --- Write path ---
+# Items are exercise names. Two items co-occur once for every user who has
+# completed both, so only a user's first completion of an item changes the
+# counts: that costs one upsert per item the user already had.
+
+def advance_cooccurrence(cursor, user_id, exercise_name, completed_at):
+    """Fold one completion into the co-occurrence index. Runs in the caller's transaction."""
+    cursor.execute(
+        "SELECT 1 FROM user_items WHERE user_id = ? AND exercise_name = ?",
+        (user_id, exercise_name),
+    )
+    if cursor.fetchone():
+        cursor.execute("""
+            UPDATE user_items SET last_completed = MAX(last_completed, ?)
+            WHERE user_id = ? AND exercise_name = ?
+        """, (completed_at, user_id, exercise_name))
+        return
+
+    cursor.execute("SELECT exercise_name FROM user_items WHERE user_id = ?", (user_id,))
+    others = [row[0] for row in cursor.fetchall()]
+
+    cursor.execute(
+        "INSERT INTO user_items (user_id, exercise_name, last_completed) VALUES (?, ?, ?)",
+        (user_id, exercise_name, completed_at),
+    )
+    cursor.execute("""
+        INSERT INTO item_stats (exercise_name, users, neighbors_stale) VALUES (?, 1, 1)
+        ON CONFLICT (exercise_name) DO UPDATE SET users = users + 1, neighbors_stale = 1
+    """, (exercise_name,))
+
+    pairs = [(exercise_name, other) for other in others] + [(other, exercise_name) for other in others]
+    cursor.executemany("""
+        INSERT INTO item_cooccurrence (item_a, item_b, count) VALUES (?, ?, 1)
+        ON CONFLICT (item_a, item_b) DO UPDATE SET count = count + 1
+    """, pairs)
+    # Their neighbor lists now rank exercise_name differently
+    cursor.executemany(
+        "UPDATE item_stats SET neighbors_stale = 1 WHERE exercise_name = ?",
+        [(other,) for other in others],
+    )
+
+
+def refresh_item_neighbors(cursor, items=None):
+    """Recompute the top-N neighbor lists of `items` (default: every stale item).
+
+    Similarity is cosine over users: co-occurrences / sqrt(users_a * users_b).
+    A list is refreshed when its own item's co-occurrences change; drift in a
+    neighbor's popularity alone waits for the next refresh of that item.
+    """
+    if items is None:
+        cursor.execute("SELECT exercise_name FROM item_stats WHERE neighbors_stale = 1")
+        items = [row[0] for row in cursor.fetchall()]
+
+    for item in items:
+        cursor.execute("SELECT users FROM item_stats WHERE exercise_name = ?", (item,))
+        row = cursor.fetchone()
+        if row is None:
+            continue
+        item_users = row[0]
+
+        cursor.execute("""
+            SELECT c.item_b, c.count, s.users
+            FROM item_cooccurrence c
+            JOIN item_stats s ON s.exercise_name = c.item_b
+            WHERE c.item_a = ?
+        """, (item,))
+        scored = [
+            (neighbor, count / math.sqrt(item_users * neighbor_users))
+            for neighbor, count, neighbor_users in cursor.fetchall()
+        ]
+        scored.sort(key=lambda pair: (-pair[1], pair[0]))
+
+        cursor.execute("DELETE FROM item_neighbors WHERE item = ?", (item,))
+        cursor.executemany(
+            "INSERT INTO item_neighbors (item, rank, neighbor, score) VALUES (?, ?, ?, ?)",
+            [(item, rank, neighbor, score) for rank, (neighbor, score) in enumerate(scored[:NEIGHBORS_PER_ITEM], 1)],
+        )
+        cursor.execute("UPDATE item_stats SET neighbors_stale = 0 WHERE exercise_name = ?", (item,))
+
+
+def rebuild_item_index(cursor):
+    """Recovery path: regenerate the whole index from completed_exercises."""
+    for table in ("item_neighbors", "item_cooccurrence", "item_stats", "user_items"):
+        cursor.execute(f"DELETE FROM {table}")
+
+    cursor.execute("""
+        INSERT INTO user_items (user_id, exercise_name, last_completed)
+        SELECT user_id, exercise_name, MAX(date_completed)
+        FROM completed_exercises
+        WHERE exercise_name IS NOT NULL
+        GROUP BY user_id, exercise_name
+    """)
+    cursor.execute("""
+        INSERT INTO item_stats (exercise_name, users, neighbors_stale)
+        SELECT exercise_name, COUNT(*), 1 FROM user_items GROUP BY exercise_name
+    """)
+    cursor.execute("""
+        INSERT INTO item_cooccurrence (item_a, item_b, count)
+        SELECT a.exercise_name, b.exercise_name, COUNT(*)
+        FROM user_items a
+        JOIN user_items b ON b.user_id = a.user_id AND b.exercise_name != a.exercise_name
+        GROUP BY a.exercise_name, b.exercise_name
+    """)
+    refresh_item_neighbors(cursor)
+
+
+# --- Read path ---
+
+def get_seed_items(cursor, user_id, limit=SEED_ITEMS):
+    """The user's most recently completed distinct items, newest first."""
+    cursor.execute("""
+        SELECT exercise_name FROM user_items
+        WHERE user_id = ?
+        ORDER BY last_completed DESC, exercise_name
+        LIMIT ?
+    """, (user_id, limit))
+    return [row[0] for row in cursor.fetchall()]
+
+
+def get_stale_items(cursor, items):
+    if not items:
+        return []
+    cursor.execute(f"""
+        SELECT exercise_name FROM item_stats
+        WHERE neighbors_stale = 1 AND exercise_name IN ({",".join("?" for _ in items)})
+    """, list(items))
+    return [row[0] for row in cursor.fetchall()]
+
+
+def merge_neighbors(cursor, items):
+    """{neighbor: summed similarity} over the neighbor lists of `items`."""
+    if not items:
+        return {}
+    cursor.execute(f"""
+        SELECT neighbor, score FROM item_neighbors
+        WHERE item IN ({",".join("?" for _ in items)})
+    """, list(items))
+    merged = {}
+    for neighbor, score in cursor.fetchall():
+        merged[neighbor] = merged.get(neighbor, 0.0) + score
+    return merged
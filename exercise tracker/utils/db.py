@@ -0,0 +1,117 @@
+import os
+import random
+import sqlite3
+import threading
+import time
+
+DB_PATH = "fitness_app.db"
+
+BUSY_TIMEOUT_MS = 5000
+STATEMENT_CACHE_SIZE = 256
+MAX_RETRIES = 5
+RETRY_BASE_DELAY = 0.05
+
+_local = threading.local()
+_registry_lock = threading.Lock()
+_open_connections = []
+_generation = 0
+
+
+def _open_connection(db_path):
+    conn = sqlite3.connect(
+        db_path,
+        timeout=BUSY_TIMEOUT_MS / 1000,
+        cached_statements=STATEMENT_CACHE_SIZE,
+        check_same_thread=False,  # only so close_all() can close other threads' handles
+    )
+    conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    return conn
+
+
+def get_connection(db_path=DB_PATH):
+    """Long-lived connection for the calling thread, opened on first use."""
+    key = os.path.abspath(db_path)
+    connections = getattr(_local, "connections", None)
+    if connections is None:
+        connections = _local.connections = {}
+
+    entry = connections.get(key)
+    if entry is not None and entry[0] == _generation:
+        return entry[1]
+
+    conn = _open_connection(db_path)
+    with _registry_lock:
+        connections[key] = (_generation, conn)
+        _open_connections.append((key, conn))
+    return conn
+
+
+def is_busy_error(error):
+    message = str(error).lower()
+    return "locked" in message or "busy" in message
+
+
+def run_with_retry(func, *args, retries=MAX_RETRIES, **kwargs):
+    """Call func, retrying with jittered exponential backoff while the DB is locked."""
+    for attempt in range(retries + 1):
+        try:
+            return func(*args, **kwargs)
+        except sqlite3.OperationalError as e:
+            if attempt == retries or not is_busy_error(e):
+                raise
+            delay = RETRY_BASE_DELAY * (2 ** attempt)
+            time.sleep(delay + random.uniform(0, delay))
+
+
+def run_in_transaction(func, db_path=DB_PATH, retries=MAX_RETRIES):
+    """Run func(conn) in a write transaction and commit it, retrying on lock contention."""
+    def attempt():
+        conn = get_connection(db_path)
+        if conn.in_transaction:
+            # Nested call: join the caller's transaction, it commits for us.
+            return func(conn)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            result = func(conn)
+            conn.commit()
+            return result
+        except BaseException:
+            conn.rollback()
+            raise
+
+    return run_with_retry(attempt, retries=retries)
+
+
+def close_connection(db_path=DB_PATH):
+    """Close the calling thread's connection to db_path, if it has one."""
+    key = os.path.abspath(db_path)
+    entry = getattr(_local, "connections", {}).pop(key, None)
+    if entry is None:
+        return
+    conn = entry[1]
+    with _registry_lock:
+        _open_connections[:] = [(k, c) for k, c in _open_connections if c is not conn]
+    conn.close()
+
+
+def close_all():
+    """Shutdown hook: optimize and close every connection handed out so far."""
+    global _generation
+    with _registry_lock:
+        connections = list(_open_connections)
+        _open_connections.clear()
+        _generation += 1  # stale thread-local handles are reopened on next use
+
+    for _, conn in connections:
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            conn.execute("PRAGMA optimize")
+        except sqlite3.Error:
+            pass
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
@@ -0,0 +1,260 @@
+import hashlib
+import os
+import threading
+
+import numpy as np
+
+from utils.db import DB_PATH
+from utils.catalog import get_catalog
+from utils.activity import energy_weight, profile_features
+
+FEATURE_COLUMNS = ("focus_area", "exercise_type", "target_body_part")
+CACHE_FORMAT = 2  # bump when the .npz layout changes
+
+
+class FeatureStore:
+    """Sparse one-hot features for the catalog, rows in catalog order.
+
+    The row features are kept in CSR form (indptr/indices/data). classes is
+    the sorted feature vocabulary (what MultiLabelBinarizer would produce),
+    names[i] and types[i] describe row i, and name_index maps a name to the
+    first row carrying it. unique_names/name_codes/name_types let scores be
+    folded from rows to exercise names.
+
+    For the rule-based strategies, sets of rows are plain int bitsets (bit i
+    is row i): type_bits holds every row of each lowercased exercise type,
+    and name_bits(codes) the rows carrying some names. Picking candidates is
+    then a few bitwise operations, and a user's completions cost one bit per
+    catalog row instead of a mask or a DataFrame.
+
+    Rows that share the same feature set score identically, so they are also
+    grouped into signatures: sig_* is the CSR of each distinct feature set,
+    and sig_rows[sig_row_indptr[s]:sig_row_indptr[s + 1]] are its rows in
+    catalog order. A user is scored once per signature, not once per row, so
+    the cost of a request grows with the number of distinct feature sets
+    rather than with the catalog.
+    """
+
+    def __init__(self, version, fingerprint, classes, names, types, indptr, indices, data):
+        self.version = version
+        self.fingerprint = fingerprint
+        self.classes = list(classes)
+        self.names = list(names)
+        self.types = list(types)
+        self.indptr = np.asarray(indptr, dtype=np.intp)
+        self.indices = np.asarray(indices, dtype=np.intp)
+        self.data = np.asarray(data, dtype=float)
+
+        self.name_index = {}
+        for row, name in enumerate(self.names):
+            self.name_index.setdefault(name, row)
+
+        # Distinct names in first-appearance order, and each row's position in that list
+        self.unique_names = list(self.name_index)
+        self.name_types = [self.types[row] for row in self.name_index.values()]
+        name_codes = {name: code for code, name in enumerate(self.unique_names)}
+        self.name_codes = np.array([name_codes[name] for name in self.names], dtype=np.intp)
+
+        types_lower = np.array([str(t).lower() if t else "" for t in self.types])
+        self.all_rows = (1 << len(self.names)) - 1
+        self.type_bits = {t: bits_from_mask(types_lower == t) for t in np.unique(types_lower).tolist()}
+
+        row_lengths = np.diff(self.indptr)
+        self.row_of_entry = np.repeat(np.arange(len(self.names)), row_lengths)
+        self.row_norms = np.sqrt(np.bincount(self.row_of_entry, weights=self.data ** 2, minlength=len(self.names)))
+
+        signatures = {}
+        row_signature = np.empty(len(self.names), dtype=np.intp)
+        for row in range(len(self.names)):
+            start, end = self.indptr[row], self.indptr[row + 1]
+            key = (tuple(self.indices[start:end]), tuple(self.data[start:end]))
+            row_signature[row] = signatures.setdefault(key, len(signatures))
+
+        sig_rows = list(signatures)
+        self.sig_indptr = np.cumsum([0] + [len(columns) for columns, _ in sig_rows], dtype=np.intp)
+        self.sig_indices = np.array([c for columns, _ in sig_rows for c in columns], dtype=np.intp)
+        self.sig_data = np.array([v for _, values in sig_rows for v in values], dtype=float)
+        sig_of_entry = np.repeat(np.arange(len(sig_rows)), np.diff(self.sig_indptr))
+        self.sig_norms = np.sqrt(np.bincount(sig_of_entry, weights=self.sig_data ** 2, minlength=len(sig_rows)))
+        self.row_signature = row_signature
+        self.sig_rows = np.argsort(row_signature, kind="stable")
+        self.sig_row_indptr = np.cumsum(np.r_[0, np.bincount(row_signature, minlength=len(sig_rows))]).astype(np.intp)
+
+    def name_bits(self, codes):
+        """Bitset of every row carrying one of the given name codes.
+
+        Built as a row mask and packed in one go: OR-ing rows into an int one
+        at a time copies the whole int each time, quadratic in the catalog.
+        """
+        wanted = np.zeros(len(self.unique_names), dtype=bool)
+        wanted[np.fromiter(codes, dtype=np.intp)] = True
+        return bits_from_mask(wanted[self.name_codes])
+
+    def rows_of(self, bits):
+        """Row numbers set in a bitset, ascending."""
+        return rows_from_bits(bits, len(self.names))
+
+    def signature_scores(self, profiles):
+        """Cosine similarity of each profile row (users x classes) with every signature."""
+        profiles = np.atleast_2d(np.asarray(profiles, dtype=float))
+        dots = np.zeros((profiles.shape[0], len(self.sig_norms)))
+        lengths = np.diff(self.sig_indptr)
+        nonempty = lengths > 0
+        if nonempty.any():
+            gathered = profiles[:, self.sig_indices] * self.sig_data
+            dots[:, nonempty] = np.add.reduceat(gathered, self.sig_indptr[:-1][nonempty], axis=1)
+
+        norms = np.outer(np.linalg.norm(profiles, axis=1), self.sig_norms)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(norms > 0, dots / norms, 0.0)
+
+
+def bits_from_mask(mask):
+    return int.from_bytes(np.packbits(mask, bitorder="little").tobytes(), "little")
+
+
+def rows_from_bits(bits, size):
+    packed = np.frombuffer(bits.to_bytes((size + 7) // 8, "little"), dtype=np.uint8)
+    return np.flatnonzero(np.unpackbits(packed, count=size, bitorder="little"))
+
+
+def _exercise_features(exercise):
+    return profile_features(*(getattr(exercise, column) for column in FEATURE_COLUMNS))
+
+
+def catalog_fingerprint(catalog):
+    digest = hashlib.sha1()
+    for e in catalog.exercises:
+        digest.update(repr((e.exercise_name, *(getattr(e, c) for c in FEATURE_COLUMNS))).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def build_feature_store(catalog, fingerprint=None):
+    row_features = [_exercise_features(e) for e in catalog.exercises]
+    classes = sorted({feature for features in row_features for feature in features})
+    class_index = {feature: i for i, feature in enumerate(classes)}
+
+    indices = [sorted(class_index[f] for f in features) for features in row_features]
+    indptr = np.cumsum([0] + [len(columns) for columns in indices])
+    flat_indices = [c for columns in indices for c in columns]
+
+    return FeatureStore(
+        catalog.version,
+        fingerprint or catalog_fingerprint(catalog),
+        classes,
+        [e.exercise_name for e in catalog.exercises],
+        [e.exercise_type for e in catalog.exercises],
+        indptr,
+        flat_indices,
+        np.ones(len(flat_indices)),
+    )
+
+
+# --- User profiles ---
+
+def user_profile(store, exercise_names, energy_levels):
+    """Energy-weighted sum of the feature rows of a user's completions.
+
+    Computed as (weights binned by catalog row) @ features, restricted to the
+    rows the history touches, so the cost is one pass over the history plus
+    a sparse product over those rows. Names that are not in the catalog are
+    skipped. This is the from-history form of the persisted profile in
+    user_feature_profile.
+    """
+    rows, weights = [], []
+    for name, energy_level in zip(exercise_names, energy_levels):
+        row = store.name_index.get(name)
+        if row is not None:
+            rows.append(row)
+            weights.append(energy_weight(energy_level))
+
+    touched, row_of_completion = np.unique(np.asarray(rows, dtype=np.intp), return_inverse=True)
+    row_weights = np.bincount(row_of_completion, weights=np.asarray(weights, dtype=float), minlength=len(touched))
+    # CSR entries of the touched rows, back to back
+    starts, lengths = store.indptr[touched], np.diff(store.indptr)[touched]
+    entries = np.repeat(starts - np.cumsum(np.r_[0, lengths[:-1]]), lengths) + np.arange(lengths.sum())
+    return np.bincount(store.indices[entries], weights=np.repeat(row_weights, lengths) * store.data[entries],
+                       minlength=len(store.classes))
+
+
+def profile_vector(store, profile):
+    """A persisted {feature: weight} profile laid out on the store's class vocabulary."""
+    return np.array([profile.get(feature, 0.0) for feature in store.classes], dtype=float)
+
+
+# --- On-disk copy ---
+
+def feature_cache_path(db_path=DB_PATH):
+    return os.path.splitext(os.path.abspath(db_path))[0] + ".features.npz"
+
+
+def save_feature_store(store, path):
+    tmp_path = path + ".tmp.npz"
+    np.savez_compressed(
+        tmp_path,
+        format=np.array(CACHE_FORMAT),
+        fingerprint=np.array(store.fingerprint),
+        classes=np.array(store.classes, dtype=str),
+        names=np.array(store.names, dtype=str),
+        types=np.array([t or "" for t in store.types], dtype=str),
+        indptr=store.indptr,
+        indices=store.indices,
+        data=store.data,
+    )
+    os.replace(tmp_path, path)
+
+
+def load_feature_store(path, version, fingerprint):
+    """The cached store at path if it was built from this exact catalog, else None."""
+    if not os.path.exists(path):
+        return None
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            if "format" not in data or int(data["format"]) != CACHE_FORMAT:
+                return None
+            if str(data["fingerprint"]) != fingerprint:
+                return None
+            return FeatureStore(version, fingerprint, data["classes"].tolist(), data["names"].tolist(),
+                                data["types"].tolist(), data["indptr"], data["indices"], data["data"])
+    except Exception as e:
+        print(f"Ignoring unreadable feature cache {path}: {e}")
+        return None
+
+
+# --- Process-wide cache ---
+
+_stores = {}
+_store_lock = threading.Lock()
+
+
+def get_feature_store(db_path=DB_PATH):
+    """Feature matrix for the current catalog, rebuilt only when the catalog changes."""
+    catalog = get_catalog(db_path)
+    store = _stores.get(db_path)
+    if store is not None and store.version == catalog.version:
+        return store
+
+    with _store_lock:
+        store = _stores.get(db_path)
+        if store is not None and store.version == catalog.version:
+            return store
+
+        path = feature_cache_path(db_path)
+        fingerprint = catalog_fingerprint(catalog)
+        store = load_feature_store(path, catalog.version, fingerprint)
+        if store is None:
+            store = build_feature_store(catalog, fingerprint)
+            try:
+                save_feature_store(store, path)
+            except OSError as e:
+                print(f"Could not write feature cache {path}: {e}")
+        _stores[db_path] = store
+        return store
+
+
+def invalidate_feature_store(db_path=None):
+    with _store_lock:
+        if db_path is None:
+            _stores.clear()
+        else:
+            _stores.pop(db_path, None)
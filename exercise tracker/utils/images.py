@@ -0,0 +1,129 @@
+import os
+import threading
+import tkinter as tk
+from collections import OrderedDict
+
+from PIL import Image, ImageTk
+
+from utils.assets import asset_store, thumbnail
+
+MAX_BYTES = 16 * 1024 * 1024  # decoded pixels kept, at 4 bytes per pixel
+
+
+class ImageCache:
+    """Decoded, resized images keyed by (path, size, mtime), with LRU eviction.
+
+    decode() reads the pre-sized copy from the asset store (utils.assets), or
+    decodes the file itself when the store has none, and is safe on any
+    thread; photo() turns the result into a PhotoImage and must run on the
+    Tk thread. The PhotoImage is kept (and the PIL copy dropped), so showing
+    an image again does no PIL work at all. Editing a file changes its mtime
+    and therefore its key.
+    """
+
+    def __init__(self, max_bytes=MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> [PIL image or None, PhotoImage or None, bytes]
+        self._bytes = 0
+        self._blanks = {}
+        self._lock = threading.Lock()
+
+    def _key(self, path, size):
+        path = os.path.abspath(path)
+        return path, tuple(size), os.stat(path).st_mtime_ns
+
+    def decode(self, path, size):
+        key = self._key(path, size)
+        with self._lock:
+            if key in self._entries:
+                return key
+
+        # Pre-sized pixels from the asset store when it has them, else the PNG itself
+        resized = asset_store.load(key[0], key[1], key[2])
+        if resized is None:
+            with Image.open(key[0]) as image:
+                resized = thumbnail(image, key[1])
+        nbytes = key[1][0] * key[1][1] * 4
+
+        with self._lock:
+            if key not in self._entries:
+                # An older version of the same file will not be asked for again
+                for stale in [k for k in self._entries if k[:2] == key[:2]]:
+                    self._bytes -= self._entries.pop(stale)[2]
+                self._entries[key] = [resized, None, nbytes]
+                self._bytes += nbytes
+                self._evict()
+        return key
+
+    def photo(self, path, size):
+        """The PhotoImage for path at size; decodes right here if it is not cached. Tk thread only."""
+        while True:
+            key = self.decode(path, size)
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is None:
+                    continue  # evicted in between
+                if entry[1] is None:
+                    entry[1] = ImageTk.PhotoImage(entry[0])
+                    entry[0] = None
+                self._entries.move_to_end(key)
+                return entry[1]
+
+    def cached_photo(self, path, size):
+        """The PhotoImage if it was already built, else None. Tk thread only."""
+        try:
+            key = self._key(path, size)
+        except OSError:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def blank(self, size):
+        """A transparent stand-in of the same size, so layouts do not jump when the image arrives."""
+        size = tuple(size)
+        if size not in self._blanks:
+            self._blanks[size] = tk.PhotoImage(width=size[0], height=size[1])
+        return self._blanks[size]
+
+    def _evict(self):
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            _, entry = self._entries.popitem(last=False)
+            self._bytes -= entry[2]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+image_cache = ImageCache()
+
+
+def show_image(loader, widget, path, size):
+    """Put path (resized to size) on a Label or Button.
+
+    A cached image is set immediately. Otherwise the widget gets a blank of
+    the same size while a loader thread decodes the file, and the image is
+    set once that finishes (unless the widget is gone by then).
+    """
+    photo = image_cache.cached_photo(path, size)
+    if photo is not None:
+        _attach(widget, photo)
+        return
+
+    widget.config(image=image_cache.blank(size))
+    loader.load(
+        widget,
+        lambda: image_cache.decode(path, size),
+        lambda _: _attach(widget, image_cache.photo(path, size)),
+        on_error=lambda e: print(f"Could not load image {path}: {e}"),
+    )
+
+
+def _attach(widget, photo):
+    widget.config(image=photo)
+    widget.image = photo  # Tk does not keep the PhotoImage alive
@@ -0,0 +1,245 @@
+import zipfile
+from itertools import islice
+from xml.etree import ElementTree
+from xml.etree.ElementTree import iterparse
+
+from utils.db import DB_PATH, get_connection, run_in_transaction
+
+WORKBOOK_PATH = "pages/Wireframe_UYL - V1.xlsx"
+SHEET_NAME = "UYL Exercises"
+CHUNK_SIZE = 5000
+
+# Workbook header -> exercises column
+COLUMNS = {
+    "Focus Area": "focus_area",
+    "Exercise Type": "exercise_type",
+    "Target Body Part": "target_body_part",
+    "Exercise Name": "exercise_name",
+    "Exercise Steps": "exercise_steps",
+    "Minimum Count / Duration": "min_count_duration",
+    "Benefit": "benefit",
+}
+FIELDS = list(COLUMNS.values())
+REQUIRED = ("focus_area", "exercise_type", "exercise_name")
+EXERCISE_TYPES = ("simple", "medium", "complex")
+
+UPSERT_SQL = f"""
+    INSERT INTO exercises ({", ".join(FIELDS)})
+    VALUES ({", ".join("?" for _ in FIELDS)})
+    ON CONFLICT (focus_area, exercise_type, exercise_name) DO UPDATE SET
+        target_body_part = excluded.target_body_part,
+        exercise_steps = excluded.exercise_steps,
+        min_count_duration = excluded.min_count_duration,
+        benefit = excluded.benefit
+"""
+# For a stored row matched only after cleaning: rewrites its key columns too
+UPDATE_SQL = f"""
+    UPDATE exercises SET {", ".join(f"{field} = ?" for field in FIELDS)}
+    WHERE id = ?
+"""
+
+
+class IngestError(Exception):
+    pass
+
+
+# --- Reading ---
+# The sheet XML is streamed straight out of the .xlsx zip: openpyxl's
+# read-only mode is several times slower on large sheets.
+
+_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_PKG_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+
+_column_indexes = {}
+
+
+def _column_index(cell_ref):
+    letters = cell_ref.rstrip("0123456789")
+    index = _column_indexes.get(letters)
+    if index is None:
+        index = 0
+        for ch in letters.upper():
+            index = index * 26 + ord(ch) - 64
+        index = _column_indexes[letters] = index - 1
+    return index
+
+
+def _sheet_member(archive, sheet_name):
+    workbook = ElementTree.fromstring(archive.read("xl/workbook.xml"))
+    rels = ElementTree.fromstring(archive.read("xl/_rels/workbook.xml.rels"))
+    targets = {rel.get("Id"): rel.get("Target") for rel in rels.iter(_PKG_REL_NS + "Relationship")}
+    for sheet in workbook.iter(_NS + "sheet"):
+        if sheet.get("name") == sheet_name:
+            target = targets[sheet.get(_REL_NS + "id")]
+            return target.lstrip("/") if target.startswith("/") else "xl/" + target
+    raise IngestError(f"Sheet '{sheet_name}' not found")
+
+
+def _shared_strings(archive):
+    if "xl/sharedStrings.xml" not in archive.namelist():
+        return []
+    strings = []
+    with archive.open("xl/sharedStrings.xml") as f:
+        for _, el in iterparse(f):
+            if el.tag == _NS + "si":
+                strings.append("".join(t.text or "" for t in el.iter(_NS + "t")))
+                el.clear()
+    return strings
+
+
+def _cell_value(cell, shared):
+    kind = cell.get("t")
+    if kind == "inlineStr":
+        return "".join(t.text or "" for t in cell.iter(_NS + "t"))
+    v = cell.find(_NS + "v")
+    if v is None or v.text is None:
+        return None
+    if kind == "s":
+        return shared[int(v.text)]
+    if kind in ("str", "e"):
+        return v.text
+    if kind == "b":
+        return v.text == "1"
+    return float(v.text)
+
+
+def iter_sheet_rows(path, sheet_name):
+    """Yield (row_number, [values]) for every row in one sheet of an .xlsx file."""
+    with zipfile.ZipFile(path) as archive:
+        member = _sheet_member(archive, sheet_name)
+        shared = _shared_strings(archive)
+        with archive.open(member) as f:
+            for _, el in iterparse(f):
+                if el.tag != _NS + "row":
+                    continue
+                values = []
+                for position, cell in enumerate(el.iter(_NS + "c")):
+                    ref = cell.get("r")
+                    index = _column_index(ref) if ref else position
+                    values.extend([None] * (index + 1 - len(values)))
+                    values[index] = _cell_value(cell, shared)
+                yield int(el.get("r", 0)), values
+                el.clear()
+
+
+def iter_workbook_rows(path=WORKBOOK_PATH, sheet_name=SHEET_NAME):
+    """Yield (row_number, {column: value}) from the sheet without loading it whole."""
+    rows = iter_sheet_rows(path, sheet_name)
+
+    _, header = next(rows, (None, []))
+    positions = {}
+    for i, title in enumerate(header):
+        title = str(title).strip() if title is not None else ""
+        if title in COLUMNS and COLUMNS[title] not in positions:
+            positions[COLUMNS[title]] = i
+    missing = [title for title, field in COLUMNS.items() if field not in positions]
+    if missing:
+        raise IngestError(f"Missing column(s) in {sheet_name}: {', '.join(missing)}")
+
+    for row_number, row in rows:
+        yield row_number, {field: row[i] if i < len(row) else None for field, i in positions.items()}
+
+
+def chunked(iterable, size=CHUNK_SIZE):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+# --- Validation ---
+
+def _clean(value):
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)  # Excel hands back 10 as 10.0
+    value = str(value).strip()
+    return value or None
+
+
+def natural_key(row):
+    """(focus_area, exercise_type, exercise_name) of a FIELDS-ordered row, cleaned like the sheet's values."""
+    return _clean(row[0]), _clean(row[1]), _clean(row[3])
+
+
+def validate_row(values):
+    """Return the row as a tuple in FIELDS order, or raise ValueError."""
+    row = {field: _clean(values.get(field)) for field in FIELDS}
+    missing = [field for field in REQUIRED if not row[field]]
+    if missing:
+        raise ValueError(f"missing {', '.join(missing)}")
+    if row["exercise_type"].lower() not in EXERCISE_TYPES:
+        raise ValueError(f"unknown exercise type '{row['exercise_type']}'")
+    return tuple(row[field] for field in FIELDS)
+
+
+# --- Loading ---
+
+def upsert_exercises(conn, rows, chunk_size=CHUNK_SIZE):
+    """Upsert (row_number, values) pairs into exercises on the natural key.
+
+    Must run inside the caller's transaction. Rows identical to what is
+    already stored are not written at all, so a re-run leaves the catalog
+    (and catalog_version) untouched. Stored rows are matched on their
+    cleaned key, the same way sheet values are cleaned, so a row stored with
+    stray whitespace is updated (and cleaned) rather than duplicated.
+    Returns the counts and the rejected rows.
+    """
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT id, {', '.join(FIELDS)} FROM exercises ORDER BY id")
+    existing = {}  # cleaned key -> (id, stored row); id is None for rows inserted by this run
+    for row_id, *stored in cursor.fetchall():
+        stored = tuple(stored)
+        key = natural_key(stored)
+        # A row stored exactly as the key wins over one that only matches once cleaned
+        if key not in existing or (stored[0], stored[1], stored[3]) == key:
+            existing[key] = (row_id, stored)
+
+    report = {"inserted": 0, "updated": 0, "unchanged": 0, "errors": []}
+    for chunk in chunked(rows, chunk_size):
+        inserts, updates = [], []
+        for row_number, values in chunk:
+            if not any(v is not None and str(v).strip() for v in values.values()):
+                continue  # blank spacer row
+            try:
+                row = validate_row(values)
+            except ValueError as e:
+                report["errors"].append((row_number, str(e)))
+                continue
+
+            key = (row[0], row[1], row[3])
+            match = existing.get(key)
+            if match is not None and match[1] == row:
+                report["unchanged"] += 1
+                continue
+            report["inserted" if match is None else "updated"] += 1
+            if match is None or match[0] is None:
+                inserts.append(row)  # a repeat within the sheet lands on ON CONFLICT
+            else:
+                updates.append((*row, match[0]))
+            existing[key] = (match[0] if match else None, row)
+
+        if updates:
+            cursor.executemany(UPDATE_SQL, updates)
+        if inserts:
+            cursor.executemany(UPSERT_SQL, inserts)
+    return report
+
+
+def ingest_workbook(path=WORKBOOK_PATH, sheet_name=SHEET_NAME, db_path=DB_PATH, dry_run=False):
+    """Stream a workbook into the exercises table in a single transaction."""
+    if dry_run:
+        conn = get_connection(db_path)
+        conn.execute("BEGIN")
+        try:
+            return upsert_exercises(conn, iter_workbook_rows(path, sheet_name))
+        finally:
+            conn.rollback()
+
+    # The row iterator is created inside the transaction so a retry starts from the top
+    return run_in_transaction(lambda conn: upsert_exercises(conn, iter_workbook_rows(path, sheet_name)), db_path)
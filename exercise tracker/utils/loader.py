@@ -0,0 +1,89 @@
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+
+class LoadHandle:
+    def __init__(self, owner):
+        self.owner = owner
+        self.future = None
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+        if self.future is not None:
+            self.future.cancel()  # no-op once running; the result is dropped instead
+
+
+class DataLoader:
+    """Runs page data fetches on a thread pool and hands results back to Tk.
+
+    fetch() runs on a worker thread and must not touch widgets; on_done and
+    on_error run on the Tk thread through `dispatch` (App.run_on_ui). Loads
+    are tied to an owner widget and dropped if it is destroyed first, so a
+    page that the user navigates away from never receives stale results.
+    Each owner gets its <Destroy> binding once, however many loads it runs.
+    """
+
+    def __init__(self, dispatch, max_workers=4):
+        self._dispatch = dispatch
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="page-loader")
+        self._handles = {}
+        self._bound_owners = weakref.WeakSet()  # owners whose <Destroy> is already bound
+        self._lock = threading.Lock()
+
+    def load(self, owner, fetch, on_done, on_error=None):
+        handle = LoadHandle(owner)
+        with self._lock:
+            needs_binding = owner not in self._bound_owners
+            self._bound_owners.add(owner)
+            self._handles.setdefault(owner, []).append(handle)
+        if needs_binding:
+            owner.bind("<Destroy>", lambda event, o=owner: self._on_destroy(event, o), add="+")
+
+        handle.future = self._executor.submit(fetch)
+        handle.future.add_done_callback(
+            lambda future: self._dispatch(self._deliver, handle, future, on_done, on_error)
+        )
+        return handle
+
+    def cancel_owner(self, owner):
+        with self._lock:
+            handles = self._handles.pop(owner, [])
+        for handle in handles:
+            handle.cancel()
+
+    def shutdown(self):
+        with self._lock:
+            owners = list(self._handles)
+        for owner in owners:
+            self.cancel_owner(owner)
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _on_destroy(self, event, owner):
+        if event.widget is owner:
+            self.cancel_owner(owner)
+
+    def _deliver(self, handle, future, on_done, on_error):
+        with self._lock:
+            handles = self._handles.get(handle.owner, [])
+            if handle in handles:
+                handles.remove(handle)
+            if not handles:
+                self._handles.pop(handle.owner, None)
+
+        if handle.cancelled or future.cancelled():
+            return
+        try:
+            if not handle.owner.winfo_exists():
+                return
+        except Exception:
+            return
+
+        error = future.exception()
+        if error is None:
+            on_done(future.result())
+        elif on_error:
+            on_error(error)
+        else:
+            print(f"Error loading page data: {error}")
@@ -0,0 +1,432 @@
+from utils.db import DB_PATH, get_connection, run_in_transaction
+from utils.cooccurrence import rebuild_item_index
+from utils.activity import (
+    rebuild_daily_activity, recompute_streaks, rebuild_user_profiles, FIRST_ROW_FEATURES_SQL,
+)
+
+
+# --- Migrations ---
+# Each step upgrades the schema by one version. PRAGMA user_version records
+# the last step applied, so steps only ever run once per database file.
+
+def _create_base_schema(cursor):
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS exercises (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        focus_area TEXT,
+        exercise_type TEXT,
+        target_body_part TEXT,
+        exercise_name TEXT,
+        exercise_steps TEXT,
+        min_count_duration TEXT,
+        benefit TEXT
+    )
+    """)
+
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS user_profile (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        age INTEGER,
+        gender TEXT,
+        phone_number TEXT UNIQUE,
+        password TEXT NOT NULL
+    )
+    """)
+
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS workout_plan (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        day TEXT,
+        body_part TEXT,
+        focus_area TEXT,
+        exercise_type TEXT
+    )
+    """)
+
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS completed_exercises (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER,
+        exercise_name TEXT,
+        date_completed INTEGER DEFAULT (strftime('%s','now')),
+        start_time INTEGER,
+        end_time INTEGER,
+        duration INTEGER,
+        reps_completed INTEGER,
+        energy_level TEXT
+    )
+    """)
+
+
+def _add_hot_path_indexes(cursor):
+    # Progress ranges, streaks and the recommender's history are all per-user
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_completed_user_date
+        ON completed_exercises (user_id, date_completed)
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_completed_user_exercise
+        ON completed_exercises (user_id, exercise_name)
+    """)
+
+    # Category filters compare case-insensitively, so the indexes are NOCASE too
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_exercises_type_focus
+        ON exercises (exercise_type COLLATE NOCASE, focus_area COLLATE NOCASE, exercise_name)
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_exercises_focus
+        ON exercises (focus_area COLLATE NOCASE)
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_exercises_name
+        ON exercises (exercise_name)
+    """)
+
+
+def _reference_exercises_by_id(cursor):
+    # The catalog lists most exercises once per focus area, so the natural key
+    # is the (focus_area, exercise_type, exercise_name) triple. Drop rows that
+    # repeat it (left behind by re-imports) before making it unique.
+    cursor.execute("""
+        DELETE FROM exercises
+        WHERE id NOT IN (
+            SELECT MIN(id) FROM exercises
+            GROUP BY focus_area, exercise_type, exercise_name
+        )
+    """)
+    cursor.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS ux_exercises_natural_key
+        ON exercises (focus_area, exercise_type, exercise_name)
+    """)
+
+    cursor.execute("""
+        ALTER TABLE completed_exercises
+        ADD COLUMN exercise_id INTEGER REFERENCES exercises(id)
+    """)
+    # History only recorded the name; attach it to the first catalog row with it
+    cursor.execute("""
+        UPDATE completed_exercises
+        SET exercise_id = (
+            SELECT MIN(e.id) FROM exercises e
+            WHERE e.exercise_name = completed_exercises.exercise_name
+        )
+        WHERE exercise_id IS NULL
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_completed_user_exercise_id
+        ON completed_exercises (user_id, exercise_id)
+    """)
+
+
+def _add_daily_activity_rollup(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS daily_activity (
+            user_id INTEGER NOT NULL,
+            local_day TEXT NOT NULL,
+            distinct_exercises INTEGER NOT NULL DEFAULT 0,
+            total_duration REAL NOT NULL DEFAULT 0,
+            sessions INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (user_id, local_day)
+        ) WITHOUT ROWID
+    """)
+    rebuild_daily_activity(cursor)
+
+
+def _add_user_streaks(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS user_streaks (
+            user_id INTEGER PRIMARY KEY,
+            current_streak INTEGER NOT NULL DEFAULT 0,
+            longest_streak INTEGER NOT NULL DEFAULT 0,
+            last_active_day TEXT
+        )
+    """)
+    recompute_streaks(cursor)
+
+
+def _add_catalog_version(cursor):
+    # Bumped by triggers on any catalog write, so in-process caches of the
+    # exercises table know when to reload
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS catalog_version (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL
+        )
+    """)
+    cursor.execute("INSERT OR IGNORE INTO catalog_version (id, version) VALUES (1, 1)")
+    for event in ("INSERT", "UPDATE", "DELETE"):
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_exercises_{event.lower()}_version
+            AFTER {event} ON exercises
+            BEGIN
+                UPDATE catalog_version SET version = version + 1 WHERE id = 1;
+            END
+        """)
+
+
+def _add_completion_record_ids(cursor):
+    # Lets the write-behind queue replay its journal without double-inserting
+    cursor.execute("ALTER TABLE completed_exercises ADD COLUMN client_record_id TEXT")
+    cursor.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS ux_completed_client_record
+        ON completed_exercises (client_record_id)
+        WHERE client_record_id IS NOT NULL
+    """)
+
+
+def _add_user_feature_profile(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS user_feature_profile (
+            user_id INTEGER NOT NULL,
+            feature TEXT NOT NULL,
+            weight REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (user_id, feature)
+        ) WITHOUT ROWID
+    """)
+    rebuild_user_profiles(cursor)
+
+
+def _add_user_recommendations(cursor):
+    # Written by the nightly batch job (get_recommendations_batch)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS user_recommendations (
+            user_id INTEGER NOT NULL,
+            rank INTEGER NOT NULL,
+            exercise_name TEXT NOT NULL,
+            exercise_type TEXT,
+            score REAL NOT NULL,
+            catalog_version INTEGER NOT NULL,
+            computed_at INTEGER NOT NULL,
+            PRIMARY KEY (user_id, rank)
+        ) WITHOUT ROWID
+    """)
+
+
+def _add_item_cooccurrence(cursor):
+    # Collaborative recommendations: who-did-what, item pair counts and each
+    # item's precomputed top-N neighbors (see utils/cooccurrence.py)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS user_items (
+            user_id INTEGER NOT NULL,
+            exercise_name TEXT NOT NULL,
+            last_completed INTEGER,
+            PRIMARY KEY (user_id, exercise_name)
+        ) WITHOUT ROWID
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS item_stats (
+            exercise_name TEXT PRIMARY KEY,
+            users INTEGER NOT NULL DEFAULT 0,
+            neighbors_stale INTEGER NOT NULL DEFAULT 1
+        ) WITHOUT ROWID
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS item_cooccurrence (
+            item_a TEXT NOT NULL,
+            item_b TEXT NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (item_a, item_b)
+        ) WITHOUT ROWID
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS item_neighbors (
+            item TEXT NOT NULL,
+            rank INTEGER NOT NULL,
+            neighbor TEXT NOT NULL,
+            score REAL NOT NULL,
+            PRIMARY KEY (item, rank)
+        ) WITHOUT ROWID
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_item_stats_stale
+        ON item_stats (exercise_name) WHERE neighbors_stale = 1
+    """)
+    rebuild_item_index(cursor)
+
+
+def _complete_workout_plan(cursor):
+    # weekly_plan.py writes, and WorkoutPage reads, columns the original
+    # workout_plan table never had
+    cursor.execute("PRAGMA table_info(workout_plan)")
+    existing = {row[1] for row in cursor.fetchall()}
+    for column in ("target_body_part", "exercise_name", "benefit", "generated_on"):
+        if column not in existing:
+            cursor.execute(f"ALTER TABLE workout_plan ADD COLUMN {column} TEXT")
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_workout_plan_focus_area
+        ON workout_plan (focus_area COLLATE NOCASE)
+    """)
+
+
+MIGRATIONS = [
+    _create_base_schema,
+    _add_hot_path_indexes,
+    _reference_exercises_by_id,
+    _add_daily_activity_rollup,
+    _add_user_streaks,
+    _add_catalog_version,
+    _add_completion_record_ids,
+    _add_user_feature_profile,
+    _add_user_recommendations,
+    _add_item_cooccurrence,
+    _complete_workout_plan,
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def get_schema_version(db_path=DB_PATH):
+    return get_connection(db_path).execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(db_path=DB_PATH):
+    """Upgrade the database in place to SCHEMA_VERSION. Returns the versions applied."""
+    applied = []
+
+    def apply_next(conn):
+        # Re-read inside the write lock in case another instance migrated first
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version >= SCHEMA_VERSION:
+            return None
+        MIGRATIONS[version](conn.cursor())
+        conn.execute(f"PRAGMA user_version = {version + 1}")
+        return version + 1
+
+    while get_schema_version(db_path) < SCHEMA_VERSION:
+        version = run_in_transaction(apply_next, db_path)
+        if version is None:
+            break
+        applied.append(version)
+
+    return applied
+
+
+# --- Query plan self-check ---
+# The queries the pages and recommender run on every visit. Each one must be
+# answered through an index; a bare "SCAN <table>" step means a full scan.
+
+HOT_QUERIES = {
+    "login": (
+        "SELECT id, name FROM user_profile WHERE phone_number = ? AND password = ?",
+        ("0", "x"),
+    ),
+    "user_age": (
+        "SELECT age FROM user_profile WHERE id = ?",
+        (1,),
+    ),
+    "catalog_version": (
+        "SELECT version FROM catalog_version WHERE id = 1",
+        (),
+    ),
+    "user_completed_total": (
+        "SELECT COUNT(DISTINCT exercise_name) FROM completed_exercises WHERE user_id = ?",
+        (1,),
+    ),
+    "user_completed_by_type": (
+        """SELECT COUNT(DISTINCT ce.exercise_name)
+           FROM completed_exercises ce
+           JOIN exercises e ON e.id = ce.exercise_id
+           WHERE ce.user_id = ? AND e.exercise_type = ? COLLATE NOCASE""",
+        (1, "simple"),
+    ),
+    "progress_range": (
+        """SELECT COUNT(DISTINCT exercise_name), SUM(duration)
+           FROM completed_exercises
+           WHERE user_id = ? AND date_completed BETWEEN ? AND ?""",
+        (1, 0, 1),
+    ),
+    "daily_activity_range": (
+        """SELECT local_day, distinct_exercises, total_duration
+           FROM daily_activity
+           WHERE user_id = ? AND local_day BETWEEN ? AND ?""",
+        (1, "2025-01-01", "2025-01-07"),
+    ),
+    "user_streaks": (
+        "SELECT current_streak, longest_streak, last_active_day FROM user_streaks WHERE user_id = ?",
+        (1,),
+    ),
+    "first_today_check": (
+        """SELECT 1 FROM completed_exercises
+           WHERE user_id = ? AND exercise_name = ? AND date_completed BETWEEN ? AND ?
+           LIMIT 1""",
+        (1, "Arm Float", 0, 1),
+    ),
+    "recommender_completed_ids": (
+        "SELECT DISTINCT exercise_id FROM completed_exercises WHERE user_id = ?",
+        (1,),
+    ),
+    "recommender_last_week": (
+        """SELECT e.exercise_type, ce.energy_level
+           FROM completed_exercises ce
+           JOIN exercises e ON e.id = ce.exercise_id
+           WHERE ce.user_id = ? AND ce.date_completed >= ?""",
+        (1, 0),
+    ),
+    "user_feature_profile": (
+        "SELECT feature, weight FROM user_feature_profile WHERE user_id = ?",
+        (1,),
+    ),
+    "user_recommendations": (
+        "SELECT exercise_name, exercise_type FROM user_recommendations WHERE user_id = ? ORDER BY rank",
+        (1,),
+    ),
+    "collaborative_seeds": (
+        """SELECT exercise_name FROM user_items
+           WHERE user_id = ?
+           ORDER BY last_completed DESC, exercise_name
+           LIMIT ?""",
+        (1, 10),
+    ),
+    "collaborative_neighbors": (
+        "SELECT neighbor, score FROM item_neighbors WHERE item IN (?, ?)",
+        ("Arm Float", "Neck Sway"),
+    ),
+    "cooccurrence_row": (
+        """SELECT c.item_b, c.count, s.users
+           FROM item_cooccurrence c
+           JOIN item_stats s ON s.exercise_name = c.item_b
+           WHERE c.item_a = ?""",
+        ("Arm Float",),
+    ),
+    "stale_neighbor_lists": (
+        "SELECT exercise_name FROM item_stats WHERE neighbors_stale = 1",
+        (),
+    ),
+    "profile_first_row": (
+        FIRST_ROW_FEATURES_SQL,
+        (1,),
+    ),
+    "workout_top_focus_area": (
+        """SELECT e.focus_area
+           FROM completed_exercises ce
+           JOIN exercises e ON e.id = ce.exercise_id
+           WHERE ce.user_id = ?
+           GROUP BY e.focus_area
+           ORDER BY COUNT(*) DESC, e.focus_area
+           LIMIT 1""",
+        (1,),
+    ),
+    "workout_plan": (
+        """SELECT day, exercise_name, exercise_type, target_body_part, benefit
+           FROM workout_plan
+           WHERE focus_area = ? COLLATE NOCASE""",
+        ("Balance",),
+    ),
+}
+
+
+def check_query_plans(db_path=DB_PATH, queries=None):
+    """EXPLAIN every hot query; returns {name: [full-scan steps]} for any that miss an index."""
+    conn = get_connection(db_path)
+    problems = {}
+    for name, (sql, params) in (queries or HOT_QUERIES).items():
+        plan = conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+        full_scans = [
+            row[3] for row in plan
+            if row[3].startswith("SCAN ") and "INDEX" not in row[3]
+        ]
+        if full_scans:
+            problems[name] = full_scans
+    return problems
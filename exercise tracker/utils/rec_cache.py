@@ -0,0 +1,77 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from utils.db import DB_PATH
+
+MAX_ENTRIES = 256
+TTL_SECONDS = 600
+
+
+class RecommendationCache:
+    """Per-user recommendation results with a TTL and LRU eviction.
+
+    Entries are dropped when the user saves a completion (invalidate_user) or
+    when the catalog version they were computed against moves on. Each user
+    also has a generation counter: a result computed while a save landed is
+    not stored, so a slow computation cannot put stale results back.
+    """
+
+    def __init__(self, max_entries=MAX_ENTRIES, ttl=TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, catalog_version):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, version, stored_at = entry
+            if version != catalog_version or time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def generation(self, user_key):
+        with self._lock:
+            return self._generations.get(user_key, 0)
+
+    def put(self, key, value, catalog_version, generation):
+        user_key = key[:2]
+        with self._lock:
+            if self._generations.get(user_key, 0) != generation:
+                return
+            self._entries[key] = (value, catalog_version, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate_user(self, user_key):
+        with self._lock:
+            self._generations[user_key] = self._generations.get(user_key, 0) + 1
+            for key in [k for k in self._entries if k[:2] == user_key]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+recommendation_cache = RecommendationCache()
+
+
+def cache_key(db_path, user_id, num_recommendations, mode="content"):
+    return (os.path.abspath(db_path), user_id, num_recommendations, mode)
+
+
+def invalidate_recommendations(user_id=None, db_path=DB_PATH):
+    """Forget cached results for one user (after they save a workout), or for everyone."""
+    if user_id is None:
+        recommendation_cache.clear()
+    else:
+        recommendation_cache.invalidate_user(cache_key(db_path, user_id, None)[:2])
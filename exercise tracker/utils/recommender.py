@@ -1,218 +1,382 @@
-import sqlite3
-import pandas as pd
-from sklearn.metrics.pairwise import cosine_similarity
 import numpy as np
-from sklearn.preprocessing import MultiLabelBinarizer
 import time
+from utils.db import get_connection, run_in_transaction
+from utils.catalog import get_catalog, get_catalog_version
+from utils.rec_cache import recommendation_cache, cache_key
+from utils.features import get_feature_store, profile_vector
+from utils.activity import get_user_profile
+from utils.cooccurrence import get_seed_items, get_stale_items, merge_neighbors, refresh_item_neighbors
+
+
+def rank_names(store, profile, excluded_codes, num_recommendations):
+    """Top-k (name_code, cosine) for one profile vector, best first.
+
+    Signatures are taken best-first with argpartition, widening the window
+    only when too few unexcluded names turn up. A name scores as the best of
+    its catalog rows, and equal scores go to the name seen first in the
+    catalog. Cost depends on the number of distinct feature sets and k, not
+    on the catalog size.
+    """
+    scores = store.signature_scores(profile)[0]
+    total = len(scores)
+    window = min(total, max(num_recommendations, 8))
+
+    while True:
+        if window < total:
+            top = np.argpartition(-scores, window - 1)[:window]
+        else:
+            top = np.arange(total)
+        top = top[np.lexsort((top, -scores[top]))]
+
+        best = {}
+        cutoff = None
+        finished = False
+        for sig in top:
+            score = scores[sig]
+            if cutoff is not None and score < cutoff:
+                finished = True
+                break
+            rows = store.sig_rows[store.sig_row_indptr[sig]:store.sig_row_indptr[sig + 1]]
+            for code in store.name_codes[rows].tolist():
+                if code not in excluded_codes and code not in best:
+                    best[code] = score
+            if cutoff is None and len(best) >= num_recommendations:
+                cutoff = score  # keep going only through signatures tied with this one
+
+        if finished or window >= total:
+            ranked = sorted(best.items(), key=lambda item: (-item[1], item[0]))
+            return [(code, float(score)) for code, score in ranked[:num_recommendations]]
+        window = min(total, window * 4)
+
 
 def get_recommendations(user_id, db_path="fitness_app.db", num_recommendations=3,
-                        simple_progress=0.0, medium_progress=0.0, complex_progress=0.0):
-    conn = None
+                        simple_progress=0.0, medium_progress=0.0, complex_progress=0.0,
+                        engine="numpy", mode="content"):
+    """Recommendations for one user, cached until they save a workout or the catalog changes.
+
+    The progress arguments are derived from the same completions that
+    invalidate the cache, so they are not part of the cache key.
+    mode="collaborative" ranks returning users by what people who did the
+    same exercises went on to do, falling back to content similarity when
+    there is nothing to go on. engine="reference" runs the original
+    pandas/scikit-learn implementation instead (uncached, content mode
+    only); only then are those libraries imported.
+    """
+    if engine == "reference":
+        from utils import recommender_reference
+        return recommender_reference.get_recommendations(
+            user_id, db_path, num_recommendations, simple_progress, medium_progress, complex_progress)
+
+    key = cache_key(db_path, user_id, num_recommendations, mode)
     try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
+        catalog_version = get_catalog_version(db_path)
+        cached = recommendation_cache.get(key, catalog_version)
+        if cached is not None:
+            return list(cached)
 
-        # --- Load all exercises ---
-        cursor.execute("SELECT exercise_name, focus_area, exercise_type, target_body_part FROM exercises")
-        all_exercises_data = cursor.fetchall()
-        all_exercises_df = pd.DataFrame(all_exercises_data,
-                                        columns=['exercise_name', 'focus_area', 'exercise_type', 'target_body_part'])
-
-        # --- Load user completed exercises ---
-        cursor.execute("""
-            SELECT e.exercise_name, e.focus_area, e.exercise_type, e.target_body_part, ce.energy_level, ce.date_completed
-            FROM completed_exercises ce
-            JOIN exercises e ON ce.exercise_name = e.exercise_name
-            WHERE ce.user_id = ?
-            ORDER BY ce.date_completed DESC
-        """, (user_id,))
-        user_completed_data = cursor.fetchall()
-        user_completed_df = pd.DataFrame(user_completed_data,
-                                         columns=['exercise_name', 'focus_area', 'exercise_type',
-                                                  'target_body_part', 'energy_level', 'date_completed'])
-
-        if all_exercises_df.empty:
-            return [("No exercises available in the library.", "")]
-
-        # --- Feature Engineering ---
-        all_unique_features_flat = []
-        for _, row in all_exercises_df.iterrows():
-            if pd.notna(row['focus_area']) and str(row['focus_area']).strip():
-                all_unique_features_flat.append(str(row['focus_area']).strip())
-            if pd.notna(row['exercise_type']) and str(row['exercise_type']).strip():
-                all_unique_features_flat.append(str(row['exercise_type']).strip())
-            if pd.notna(row['target_body_part']) and str(row['target_body_part']).strip():
-                all_unique_features_flat.append(str(row['target_body_part']).strip())
-
-        mlb = MultiLabelBinarizer()
-        mlb.fit([list(set(all_unique_features_flat))])
-
-        features_for_all_exercises_transform = []
-        for _, row in all_exercises_df.iterrows():
-            current_features = []
-            if pd.notna(row['focus_area']) and str(row['focus_area']).strip():
-                current_features.append(str(row['focus_area']).strip())
-            if pd.notna(row['exercise_type']) and str(row['exercise_type']).strip():
-                current_features.append(str(row['exercise_type']).strip())
-            if pd.notna(row['target_body_part']) and str(row['target_body_part']).strip():
-                current_features.append(str(row['target_body_part']).strip())
-            features_for_all_exercises_transform.append(current_features)
-
-        features_matrix = mlb.transform(features_for_all_exercises_transform)
-        features_df = pd.DataFrame(features_matrix, columns=mlb.classes_,
-                                   index=all_exercises_df['exercise_name'])
-
-        # --- Recommendation Strategy ---
-        recommendation_strategy = "default"
-        is_eligible_for_complex = False
-
-        if not user_completed_df.empty and medium_progress >= 50.0:
-            one_week_ago = time.time() - 7 * 86400
-            last_week_data = user_completed_df[user_completed_df['date_completed'] >= one_week_ago]
-
-            if not last_week_data.empty:
-                medium_high_energy_count = last_week_data[
-                    (last_week_data['exercise_type'].str.lower() == 'medium') &
-                    (last_week_data['energy_level'].str.lower() == 'high')
-                ].shape[0]
-
-                medium_total = last_week_data[
-                    last_week_data['exercise_type'].str.lower() == 'medium'
-                ].shape[0]
-
-                if medium_total > 0 and (medium_high_energy_count / medium_total) >= 0.7:
-                    is_eligible_for_complex = True
-
-        if is_eligible_for_complex:
-            recommendation_strategy = "complex_and_simple"
-        elif user_completed_df.empty:
-            recommendation_strategy = "new_user"
-
-        recommended_exercises_output = []
-        added_recommendations_set = set()
-
-        # Exclude already completed
-        completed_exercise_names = user_completed_df['exercise_name'].unique()
-        uncompleted_exercises_df = all_exercises_df[
-            ~all_exercises_df['exercise_name'].isin(completed_exercise_names)
-        ].copy()
-
-        if uncompleted_exercises_df.empty:
-            return [("You've completed all available exercises! Great job!", "")]
-
-        # --- Case 1: New User ---
-        if recommendation_strategy == "new_user":
-            user_age = None
-            cursor.execute("SELECT age FROM user_profile WHERE id = ?", (user_id,))
-            age_row = cursor.fetchone()
-            if age_row:
-                user_age = age_row[0]
-
-            if user_age is not None:
-                if user_age >= 60:
-                    suggested_type = 'simple'
-                elif user_age > 40:
-                    suggested_type = 'medium'
-                else:
-                    suggested_type = 'complex'
-
-                recs_from_type = uncompleted_exercises_df[
-                    uncompleted_exercises_df['exercise_type'].str.lower() == suggested_type
-                ].copy()
-
-                if not recs_from_type.empty:
-                    for _, rec in recs_from_type.sample(
-                            n=min(num_recommendations, len(recs_from_type))).iterrows():
-                        recommended_exercises_output.append((rec['exercise_name'], rec['exercise_type']))
-                    return recommended_exercises_output
-
-            return [("Complete your first exercise to get personalized recommendations!", "")]
-
-        # --- Case 2: Complex + Simple Mix ---
-        elif recommendation_strategy == "complex_and_simple":
-            complex_recs = uncompleted_exercises_df[
-                uncompleted_exercises_df['exercise_type'].str.lower() == 'complex'
-            ].copy()
-            if not complex_recs.empty:
-                for _, rec in complex_recs.sample(n=min(2, len(complex_recs))).iterrows():
-                    recommended_exercises_output.append((rec['exercise_name'], rec['exercise_type']))
-                    added_recommendations_set.add(rec['exercise_name'])
-
-            if len(recommended_exercises_output) < num_recommendations:
-                simple_recs = uncompleted_exercises_df[
-                    uncompleted_exercises_df['exercise_type'].str.lower() == 'simple'
-                ].copy()
-                simple_recs = simple_recs[~simple_recs['exercise_name'].isin(added_recommendations_set)]
-                if not simple_recs.empty:
-                    for _, rec in simple_recs.sample(
-                            n=min(num_recommendations - len(recommended_exercises_output), len(simple_recs))
-                    ).iterrows():
-                        recommended_exercises_output.append((rec['exercise_name'], rec['exercise_type']))
-                        added_recommendations_set.add(rec['exercise_name'])
-
-            if len(recommended_exercises_output) < num_recommendations:
-                fallback_recs = uncompleted_exercises_df[
-                    ~uncompleted_exercises_df['exercise_name'].isin(added_recommendations_set)
-                ].copy()
-                for _, rec in fallback_recs.sample(
-                        n=min(num_recommendations - len(recommended_exercises_output), len(fallback_recs))
-                ).iterrows():
-                    recommended_exercises_output.append((rec['exercise_name'], rec['exercise_type']))
-                    added_recommendations_set.add(rec['exercise_name'])
-
-            return recommended_exercises_output
-
-        # --- Case 3: Default (similarity-based) ---
-        else:
-            uncompleted_features_df = features_df.loc[uncompleted_exercises_df['exercise_name']]
-            user_profile_features = np.zeros(len(mlb.classes_))
-
-            for _, row in user_completed_df.iterrows():
-                exercise_name = row['exercise_name']
-                energy_level = str(row['energy_level']).lower()
-                if exercise_name in features_df.index:
-                    # Always reduce to 1D vector (fix for duplicates)
-                    exercise_vector = features_df.loc[exercise_name]
-                    if isinstance(exercise_vector, pd.DataFrame):
-                        exercise_vector = exercise_vector.iloc[0].values
-                    else:
-                        exercise_vector = exercise_vector.values
-
-                    if energy_level == 'high':
-                        user_profile_features += exercise_vector * 1.5
-                    elif energy_level == 'medium':
-                        user_profile_features += exercise_vector * 1.0
-                    else:
-                        user_profile_features += exercise_vector * 0.5
-
-            if np.sum(user_profile_features) > 0:
-                user_profile_features /= np.sum(user_profile_features)
-            else:
-                return [("Complete some exercises to get personalized recommendations!", "")]
-
-            similarities = cosine_similarity(user_profile_features.reshape(1, -1), uncompleted_features_df)
-            recommended_indices = similarities.argsort()[0][::-1]
-
-            for idx in recommended_indices:
-                exercise_name = uncompleted_features_df.index[idx]
-                if exercise_name not in added_recommendations_set:
-                    ex_type = all_exercises_df[
-                        all_exercises_df['exercise_name'] == exercise_name
-                    ]['exercise_type'].iloc[0]
-                    recommended_exercises_output.append((exercise_name, ex_type))
-                    added_recommendations_set.add(exercise_name)
-                if len(recommended_exercises_output) >= num_recommendations:
-                    break
-
-            if not recommended_exercises_output:
-                return [("No specific recommendations at this time.", "")]
-            return recommended_exercises_output
+        generation = recommendation_cache.generation(key[:2])
+        recs = _compute_recommendations(user_id, db_path, num_recommendations,
+                                        simple_progress, medium_progress, complex_progress, mode)
+        recommendation_cache.put(key, tuple(recs), catalog_version, generation)
+        return recs
 
     except Exception as e:
         print(f"Error in get_recommendations: {e}")
         return [("Could not generate recommendations at this time.", "")]
-    finally:
-        if conn:
-            conn.close()
 
 
+def cached_recommendations(user_id, db_path="fitness_app.db", num_recommendations=3, mode="content"):
+    """The cached result for this user (a list, like get_recommendations), or None if it would have to be computed."""
+    try:
+        cached = recommendation_cache.get(cache_key(db_path, user_id, num_recommendations, mode),
+                                          get_catalog_version(db_path))
+    except Exception:
+        return None
+    return list(cached) if cached is not None else None
+
+
+def rank_collaborative(db_path, store, user_id, excluded_codes, num_recommendations):
+    """Top-k (name_code, score) from the neighbor lists of the user's recent exercises.
+
+    Any of those lists that went stale since the last refresh are recomputed
+    (and saved) first. Ties go to the name seen first in the catalog.
+    """
+    cursor = get_connection(db_path).cursor()
+    seeds = get_seed_items(cursor, user_id)
+    stale = get_stale_items(cursor, seeds)
+    if stale:
+        run_in_transaction(lambda conn: refresh_item_neighbors(conn.cursor(), stale), db_path)
+
+    ranked = []
+    for name, score in merge_neighbors(cursor, seeds).items():
+        row = store.name_index.get(name)
+        if row is None:
+            continue  # no longer in the catalog
+        code = int(store.name_codes[row])
+        if code not in excluded_codes:
+            ranked.append((code, score))
+    ranked.sort(key=lambda item: (-item[1], item[0]))
+    return ranked[:num_recommendations]
+
+
+def _sample_rows(rows, n):
+    """n rows picked at random without replacement.
+
+    Draws from NumPy's global generator exactly the way DataFrame.sample(n=n)
+    does, so a seeded run matches the reference engine pick for pick.
+    """
+    return rows[np.random.choice(len(rows), size=n, replace=False)]
+
+
+def _compute_recommendations(user_id, db_path, num_recommendations,
+                             simple_progress, medium_progress, complex_progress, mode="content"):
+    cursor = get_connection(db_path).cursor()
+
+    # --- Load the catalog and its features (cached per catalog version) ---
+    store = get_feature_store(db_path)
+
+    # --- Load what the user has completed (not their whole history) ---
+    catalog = get_catalog(db_path)
+    cursor.execute("SELECT DISTINCT exercise_id FROM completed_exercises WHERE user_id = ?", (user_id,))
+    completed_exercise_names = list(dict.fromkeys(
+        catalog.by_id[exercise_id].exercise_name
+        for (exercise_id,) in cursor.fetchall() if exercise_id in catalog.by_id
+    ))
+    has_history = bool(completed_exercise_names)
+
+    if not store.names:
+        return [("No exercises available in the library.", "")]
+
+    # --- Recommendation Strategy ---
+    recommendation_strategy = "default"
+    is_eligible_for_complex = False
+
+    if has_history and medium_progress >= 50.0:
+        one_week_ago = time.time() - 7 * 86400
+        cursor.execute("""
+            SELECT e.exercise_type, ce.energy_level
+            FROM completed_exercises ce
+            JOIN exercises e ON e.id = ce.exercise_id
+            WHERE ce.user_id = ? AND ce.date_completed >= ?
+        """, (user_id, one_week_ago))
+        last_week_energy = [
+            energy_level for exercise_type, energy_level in cursor.fetchall()
+            if isinstance(exercise_type, str) and exercise_type.lower() == 'medium'
+        ]
+
+        medium_total = len(last_week_energy)
+        medium_high_energy_count = sum(
+            1 for energy_level in last_week_energy
+            if isinstance(energy_level, str) and energy_level.lower() == 'high'
+        )
+
+        if medium_total > 0 and (medium_high_energy_count / medium_total) >= 0.7:
+            is_eligible_for_complex = True
+
+    if is_eligible_for_complex:
+        recommendation_strategy = "complex_and_simple"
+    elif not has_history:
+        recommendation_strategy = "new_user"
+
+    recommended_exercises_output = []
+
+    # Exclude already completed
+    excluded_codes = {int(store.name_codes[store.name_index[name]]) for name in completed_exercise_names}
+    if len(excluded_codes) >= len(store.unique_names):
+        return [("You've completed all available exercises! Great job!", "")]
+
+    if recommendation_strategy != "default":
+        uncompleted = store.all_rows & ~store.name_bits(excluded_codes)
+
+    # --- Case 1: New User ---
+    if recommendation_strategy == "new_user":
+        user_age = None
+        cursor.execute("SELECT age FROM user_profile WHERE id = ?", (user_id,))
+        age_row = cursor.fetchone()
+        if age_row:
+            user_age = age_row[0]
+
+        if user_age is not None:
+            if user_age >= 60:
+                suggested_type = 'simple'
+            elif user_age > 40:
+                suggested_type = 'medium'
+            else:
+                suggested_type = 'complex'
+
+            recs_from_type = store.rows_of(uncompleted & store.type_bits.get(suggested_type, 0))
+            if len(recs_from_type):
+                for row in _sample_rows(recs_from_type, min(num_recommendations, len(recs_from_type))):
+                    recommended_exercises_output.append((store.names[row], store.types[row]))
+                return recommended_exercises_output
+
+        return [("Complete your first exercise to get personalized recommendations!", "")]
+
+    # --- Case 2: Complex + Simple Mix ---
+    elif recommendation_strategy == "complex_and_simple":
+        added_codes = set()
+
+        def take(rows):
+            for row in rows:
+                recommended_exercises_output.append((store.names[row], store.types[row]))
+                added_codes.add(int(store.name_codes[row]))
+
+        complex_recs = store.rows_of(uncompleted & store.type_bits.get('complex', 0))
+        if len(complex_recs):
+            take(_sample_rows(complex_recs, min(2, len(complex_recs))))
+
+        if len(recommended_exercises_output) < num_recommendations:
+            simple_recs = store.rows_of(
+                uncompleted & store.type_bits.get('simple', 0) & ~store.name_bits(added_codes))
+            if len(simple_recs):
+                take(_sample_rows(simple_recs,
+                                  min(num_recommendations - len(recommended_exercises_output), len(simple_recs))))
+
+        if len(recommended_exercises_output) < num_recommendations:
+            fallback_recs = store.rows_of(uncompleted & ~store.name_bits(added_codes))
+            take(_sample_rows(fallback_recs,
+                              min(num_recommendations - len(recommended_exercises_output), len(fallback_recs))))
+
+        return recommended_exercises_output
+
+    # --- Case 3: Default (similarity-based) ---
+    else:
+        if mode == "collaborative":
+            for code, _ in rank_collaborative(db_path, store, user_id, excluded_codes, num_recommendations):
+                recommended_exercises_output.append((store.unique_names[code], store.name_types[code]))
+            if recommended_exercises_output:
+                return recommended_exercises_output
+
+        user_profile_features = profile_vector(store, get_user_profile(cursor, user_id))
+
+        # Cosine similarity ignores scale, so the profile is used as stored
+        if np.sum(user_profile_features) <= 0:
+            return [("Complete some exercises to get personalized recommendations!", "")]
+
+        for code, _ in rank_names(store, user_profile_features, excluded_codes, num_recommendations):
+            recommended_exercises_output.append((store.unique_names[code], store.name_types[code]))
+
+        if not recommended_exercises_output:
+            return [("No specific recommendations at this time.", "")]
+        return recommended_exercises_output
+
+
+# --- Batch scoring ---
+# The nightly job precomputes the similarity-based ranking (the default
+# strategy above) for many users at once from their stored feature profiles.
+# The new-user and complex+simple rules depend on live progress and stay in
+# get_recommendations.
+
+BATCH_SCORE_CELLS = 4_000_000  # users x catalog rows scored per matrix multiply
+ID_CHUNK = 500  # ids per IN (...) lookup
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _load_profiles(cursor, store, user_ids):
+    class_index = {feature: i for i, feature in enumerate(store.classes)}
+    user_row = {user_id: i for i, user_id in enumerate(user_ids)}
+    profiles = np.zeros((len(user_ids), len(store.classes)))
+    for chunk in _chunks(user_ids, ID_CHUNK):
+        cursor.execute(f"""
+            SELECT user_id, feature, weight FROM user_feature_profile
+            WHERE user_id IN ({",".join("?" for _ in chunk)})
+        """, chunk)
+        for user_id, feature, weight in cursor.fetchall():
+            column = class_index.get(feature)
+            if column is not None:
+                profiles[user_row[user_id], column] = weight
+    return profiles
+
+
+def _load_completed(cursor, store, catalog, user_ids):
+    """Boolean (users x names) mask of exercise names each user has completed."""
+    user_row = {user_id: i for i, user_id in enumerate(user_ids)}
+    completed = np.zeros((len(user_ids), len(store.unique_names)), dtype=bool)
+    for chunk in _chunks(user_ids, ID_CHUNK):
+        cursor.execute(f"""
+            SELECT DISTINCT user_id, exercise_id FROM completed_exercises
+            WHERE user_id IN ({",".join("?" for _ in chunk)})
+        """, chunk)
+        for user_id, exercise_id in cursor.fetchall():
+            exercise = catalog.by_id.get(exercise_id)
+            if exercise is not None:
+                completed[user_row[user_id], store.name_codes[store.name_index[exercise.exercise_name]]] = True
+    return completed
+
+
+def score_users(store, profiles, completed, num_recommendations):
+    """Top-k (name_code, cosine) per user, best first; [] for users with no profile.
+
+    An exercise name scores as the best of its catalog rows, and names the
+    user has completed are masked out. Ties go to the name seen first in the
+    catalog.
+    """
+    order = np.argsort(store.name_codes, kind="stable")
+    starts = np.flatnonzero(np.r_[True, np.diff(store.name_codes[order]) != 0])
+    profile_norms = np.linalg.norm(profiles, axis=1)
+
+    row_scores = store.signature_scores(profiles)[:, store.row_signature]
+    name_scores = np.maximum.reduceat(row_scores[:, order], starts, axis=1)
+    name_scores[completed] = -np.inf
+
+    k = min(num_recommendations, name_scores.shape[1])
+    results = []
+    for user, scores in enumerate(name_scores):
+        if profile_norms[user] == 0 or k == 0:
+            results.append([])
+            continue
+        kth_score = scores[np.argpartition(-scores, k - 1)[k - 1]]
+        top = np.flatnonzero(scores >= kth_score)  # everything tied with the k-th, so ties break by catalog order
+        top = top[np.lexsort((top, -scores[top]))][:k]
+        results.append([(code, scores[code]) for code in top if np.isfinite(scores[code])])
+    return results
+
+
+def get_recommendations_batch(user_ids=None, db_path="fitness_app.db", num_recommendations=5):
+    """Score every given user (default: all users) and store their top-k in user_recommendations.
+
+    Users are scored in blocks; each block is committed on its own so the
+    app can keep saving workouts while a long run is in progress. Returns
+    the number of users that got recommendations.
+    """
+    cursor = get_connection(db_path).cursor()
+    catalog = get_catalog(db_path)
+    store = get_feature_store(db_path)
+
+    if user_ids is None:
+        cursor.execute("SELECT id FROM user_profile ORDER BY id")
+        user_ids = [row[0] for row in cursor.fetchall()]
+    user_ids = list(user_ids)
+
+    block_size = max(1, BATCH_SCORE_CELLS // max(1, len(store.names)))
+    scored_users = 0
+
+    for block in _chunks(user_ids, block_size):
+        profiles = _load_profiles(cursor, store, block)
+        completed = _load_completed(cursor, store, catalog, block)
+        computed_at = int(time.time())
+
+        rows = []
+        for user_id, top in zip(block, score_users(store, profiles, completed, num_recommendations)):
+            scored_users += bool(top)
+            rows.extend(
+                (user_id, rank, store.unique_names[code], store.name_types[code], float(score), store.version, computed_at)
+                for rank, (code, score) in enumerate(top, start=1)
+            )
+
+        def write_block(conn, block=block, rows=rows):
+            for chunk in _chunks(block, ID_CHUNK):
+                conn.execute(f"DELETE FROM user_recommendations WHERE user_id IN ({','.join('?' for _ in chunk)})", chunk)
+            conn.executemany("""
+                INSERT INTO user_recommendations
+                    (user_id, rank, exercise_name, exercise_type, score, catalog_version, computed_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, rows)
+
+        run_in_transaction(write_block, db_path)
+
+    return scored_users
@@ -0,0 +1,21 @@
+class Session:
+    """The logged-in user's profile, read once at login.
+
+    Pages take the user's id, name and age from here instead of querying
+    user_profile on every navigation. UserPage.save_profile calls update()
+    after its write commits so the two never disagree. Only the Tk thread
+    changes it; loader fetches get the values they need passed in.
+    """
+
+    def __init__(self, user_id, name, age=None, gender=None, phone_number=None):
+        self.user_id = user_id
+        self.name = name
+        self.age = age
+        self.gender = gender
+        self.phone_number = phone_number
+
+    def update(self, **fields):
+        for field, value in fields.items():
+            if not hasattr(self, field) or field == "user_id":
+                raise AttributeError(f"Session has no editable field '{field}'")
+            setattr(self, field, value)
@@ -0,0 +1,60 @@
+import importlib
+import sys
+import threading
+import time
+
+# main.py imports this module first, so the clock starts before anything heavy loads
+started_at = time.perf_counter()
+enabled = False  # set by main.py --startup-report
+
+HEAVY_MODULES = ("numpy", "matplotlib", "pygame", "PIL", "pandas", "sklearn")
+
+_marks = []
+_imports = []
+_lock = threading.Lock()
+
+
+def elapsed_ms():
+    return (time.perf_counter() - started_at) * 1000
+
+
+def mark(label):
+    with _lock:
+        _marks.append((label, elapsed_ms()))
+
+
+def import_module(name):
+    """importlib.import_module, timing the first import of each module."""
+    if name in sys.modules:
+        return sys.modules[name]
+    start = time.perf_counter()
+    module = importlib.import_module(name)
+    took = (time.perf_counter() - start) * 1000
+    with _lock:
+        _imports.append((name, took, threading.current_thread().name))
+    if enabled:
+        print(f"[startup] {elapsed_ms():8.1f} ms  imported {name} in {took:.1f} ms ({threading.current_thread().name})")
+    return module
+
+
+def warm_up(names):
+    """Import modules ahead of need, off the Tk thread. Failures surface on real navigation instead."""
+    for name in names:
+        try:
+            import_module(name)
+        except Exception as e:
+            print(f"Warm-up could not import {name}: {e}")
+
+
+def report():
+    with _lock:
+        marks = list(_marks)
+        imports = list(_imports)
+    print("[startup] --- startup report ---")
+    for label, at in marks:
+        print(f"[startup] {at:8.1f} ms  {label}")
+    for name, took, thread in imports:
+        print(f"[startup]           {name}: {took:.1f} ms ({thread})")
+    loaded = [name for name in HEAVY_MODULES if name in sys.modules]
+    deferred = [name for name in HEAVY_MODULES if name not in sys.modules]
+    print(f"[startup] heavy modules loaded: {', '.join(loaded) or 'none'}; deferred: {', '.join(deferred) or 'none'}")
@@ -0,0 +1,32 @@
+from utils.catalog import Exercise, ExerciseCatalog
+
+
+def body_parts(count):
+    return [f"Part {i}" for i in range(count)]
+
+
+# Roughly the shape of the real workbook: a handful of focus areas and types,
+# a few dozen body parts, and names that repeat across focus areas
+FOCUS_AREAS = [f"Focus {i}" for i in range(12)]
+TYPES = ["Simple", "Medium", "Complex"]
+BODY_PARTS = body_parts(40)
+
+
+def synthetic_rows(size, rnd, parts=BODY_PARTS):
+    """size exercises rows (no id), each name appearing under two focus areas (the natural key stays unique).
+
+    At most len(FOCUS_AREAS) * len(TYPES) * len(parts) distinct feature
+    sets exist, so pass more parts for catalogs with more signatures.
+    """
+    rows = []
+    for name in range((size + 1) // 2):
+        exercise_type = rnd.choice(TYPES)
+        for focus_area in rnd.sample(FOCUS_AREAS, 2):
+            rows.append((focus_area, exercise_type, rnd.choice(parts), f"Exercise {name}", "", "", ""))
+    return rows[:size]
+
+
+def synthetic_catalog(size, rnd, parts=BODY_PARTS):
+    """An in-memory catalog of synthetic_rows(size, rnd, parts), numbered from 1."""
+    rows = synthetic_rows(size, rnd, parts)
+    return ExerciseCatalog((Exercise(i + 1, *row) for i, row in enumerate(rows)), version=1)
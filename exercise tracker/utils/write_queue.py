@@ -0,0 +1,264 @@
+import heapq
+import itertools
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+
+from utils.db import DB_PATH, run_in_transaction
+from utils.activity import record_completion
+from utils.rec_cache import invalidate_recommendations
+
+BATCH_SIZE = 50
+BATCH_WINDOW = 0.2  # seconds to wait for more records before committing a batch
+RETRY_BASE_DELAY = 0.5  # seconds before the first retry of a record the database refused
+RETRY_MAX_DELAY = 30.0  # the delay doubles per attempt up to this
+
+_STOP = object()
+
+
+def new_completion(user_id, exercise_id, exercise_name, completed_at,
+                   start_time, end_time, duration, reps, energy_level):
+    return {
+        "record_id": uuid.uuid4().hex,
+        "user_id": user_id,
+        "exercise_id": exercise_id,
+        "exercise_name": exercise_name,
+        "completed_at": completed_at,
+        "start_time": start_time,
+        "end_time": end_time,
+        "duration": duration,
+        "reps": reps,
+        "energy_level": energy_level,
+    }
+
+
+class CompletionWriter:
+    """Write-behind queue for completed exercises.
+
+    submit() appends the record to a JSONL journal (fsynced before it
+    returns) and a worker thread commits records in batches. A record that
+    fails with an OperationalError (database locked, disk I/O) stays in the
+    journal and is retried on the worker thread with exponential backoff
+    until it lands; on_commit fires then, and on_error only for errors a
+    retry cannot fix. on_retrying(count) is told how many records are
+    waiting for a retry whenever that changes, so the UI can show it.
+    Records still in the journal when the app starts again (after a crash,
+    or closing mid-retry) are replayed, and the client_record_id unique
+    index keeps replays from double-inserting. Callbacks run on the worker
+    thread, so UI code should marshal them back to Tk (App.run_on_ui).
+    """
+
+    def __init__(self, db_path=DB_PATH, journal_path=None, on_retrying=None):
+        self.db_path = db_path
+        self.journal_path = journal_path or os.path.splitext(os.path.abspath(db_path))[0] + ".pending.jsonl"
+        self.on_retrying = on_retrying
+        self._queue = queue.Queue()
+        self._pending = {}
+        self._journal_lock = threading.Lock()
+        self._thread = None
+        # Worker thread only: (due time, tiebreak, item, attempt) of records to try again
+        self._retries = []
+        self._retry_order = itertools.count()
+
+    def start(self):
+        if self._thread is not None:
+            return
+        for record in self._read_journal():
+            self._pending[record["record_id"]] = record
+            self._queue.put((record, None, None))
+        self._thread = threading.Thread(target=self._run, name="completion-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, record, on_commit=None, on_error=None):
+        with self._journal_lock:
+            self._pending[record["record_id"]] = record
+            with open(self.journal_path, "a", encoding="utf-8") as journal:
+                journal.write(json.dumps(record) + "\n")
+                _sync(journal)  # a record that submit() accepted survives a crash
+        self._queue.put((record, on_commit, on_error))
+
+    def flush(self):
+        """Block until every submitted record has been tried once (committed, failed or waiting for a retry)."""
+        self._queue.join()
+
+    def retrying_count(self):
+        return len(self._retries)
+
+    def stop(self, timeout=10):
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+
+    # --- Journal ---
+
+    def _read_journal(self):
+        if not os.path.exists(self.journal_path):
+            return []
+        records = []
+        with open(self.journal_path, encoding="utf-8") as journal:
+            for line in journal:
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    pass  # torn final line from a crash mid-write
+        return records
+
+    def _forget(self, record_ids):
+        with self._journal_lock:
+            for record_id in record_ids:
+                self._pending.pop(record_id, None)
+            if not self._pending:
+                if os.path.exists(self.journal_path):
+                    os.remove(self.journal_path)
+                return
+            tmp_path = self.journal_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as journal:
+                for record in self._pending.values():
+                    journal.write(json.dumps(record) + "\n")
+                _sync(journal)
+            os.replace(tmp_path, self.journal_path)
+
+    # --- Worker ---
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            try:
+                item = self._queue.get(timeout=self._next_retry_in())
+            except queue.Empty:
+                self._commit([], self._due_retries())
+                continue
+            if item is _STOP:
+                self._queue.task_done()
+                break
+            batch = [item]
+            while len(batch) < BATCH_SIZE:
+                try:
+                    item = self._queue.get(timeout=BATCH_WINDOW)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    self._queue.task_done()
+                    stopping = True
+                    break
+                batch.append(item)
+            self._commit(batch, self._due_retries())
+
+        # Drain anything submitted after the stop request
+        leftovers = []
+        while True:
+            try:
+                leftovers.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        for item in leftovers:
+            if item is _STOP:
+                self._queue.task_done()
+        leftovers = [item for item in leftovers if item is not _STOP]
+        retries = [(item, attempt) for _, _, item, attempt in self._retries]
+        self._retries = []
+        # One last attempt; anything still refused is replayed on the next start
+        self._commit(leftovers, retries, retry=False)
+
+    # --- Retries ---
+
+    def _next_retry_in(self):
+        if not self._retries:
+            return None
+        return max(0.0, self._retries[0][0] - time.monotonic())
+
+    def _due_retries(self):
+        due = []
+        now = time.monotonic()
+        while self._retries and self._retries[0][0] <= now:
+            _, _, item, attempt = heapq.heappop(self._retries)
+            due.append((item, attempt))
+        return due
+
+    def _schedule_retry(self, item, attempt):
+        delay = min(RETRY_BASE_DELAY * 2 ** attempt, RETRY_MAX_DELAY)
+        heapq.heappush(self._retries, (time.monotonic() + delay, next(self._retry_order), item, attempt + 1))
+
+    def _notify_retrying(self, before):
+        if self.on_retrying and len(self._retries) != before:
+            try:
+                self.on_retrying(len(self._retries))
+            except Exception as e:
+                print(f"Error in retry callback: {e}")
+
+    # --- Commit ---
+
+    def _commit(self, batch, retries, retry=True):
+        """Write fresh queue items and due retries ((item, attempt) pairs) together."""
+        retrying_before = len(self._retries) + len(retries)
+        attempts = [(item, 0, True) for item in batch] + [(item, attempt, False) for item, attempt in retries]
+        if not attempts:
+            return
+        try:
+            run_in_transaction(lambda conn: [self._write(conn, item[0]) for item, _, _ in attempts], self.db_path)
+            results = [(attempt, None) for attempt in attempts]
+        except sqlite3.OperationalError as e:
+            # Locked or unwritable: every record would wait out the same lock again
+            results = [(attempt, e) for attempt in attempts]
+        except Exception:
+            # Isolate the bad record so the rest of the batch still lands
+            results = []
+            for attempt in attempts:
+                try:
+                    run_in_transaction(lambda conn: self._write(conn, attempt[0][0]), self.db_path)
+                    results.append((attempt, None))
+                except Exception as e:
+                    results.append((attempt, e))
+
+        # Records that hit an operational error (locked, disk I/O) stay in the
+        # journal and are tried again with backoff
+        self._forget([
+            item[0]["record_id"] for (item, _, _), error in results
+            if not isinstance(error, sqlite3.OperationalError)
+        ])
+        waiting = set()
+        if retry:
+            for (item, attempt, _), error in results:
+                if isinstance(error, sqlite3.OperationalError):
+                    self._schedule_retry(item, attempt)
+                    waiting.add(item[0]["record_id"])
+        self._notify_retrying(retrying_before)
+
+        # Cached recommendations are stale once a user's new workout is in
+        for user_id in {item[0]["user_id"] for (item, _, _), error in results if error is None}:
+            invalidate_recommendations(user_id, self.db_path)
+
+        for ((record, on_commit, on_error), _, fresh), error in results:
+            if record["record_id"] in waiting:
+                callback = None  # not final yet: on_commit fires once a retry lands
+            else:
+                callback = on_commit if error is None else on_error
+            if callback:
+                try:
+                    callback(record if error is None else error)
+                except Exception as e:
+                    print(f"Error in completion callback: {e}")
+            if fresh:
+                self._queue.task_done()
+
+    def _write(self, conn, record):
+        cursor = conn.cursor()
+        cursor.execute("SELECT 1 FROM completed_exercises WHERE client_record_id = ?", (record["record_id"],))
+        if cursor.fetchone():
+            return  # already committed before a crash
+        record_completion(
+            conn, record["user_id"], record["exercise_id"], record["exercise_name"], record["completed_at"],
+            record["start_time"], record["end_time"], record["duration"], record["reps"], record["energy_level"],
+            record_id=record["record_id"],
+        )
+
+
+def _sync(journal):
+    journal.flush()
+    os.fsync(journal.fileno())